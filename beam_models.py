@@ -0,0 +1,236 @@
+import numpy as np
+from constants import *
+from crt_simulation import ElectronBeam
+
+def relativistic_factor(V_acc):
+    """
+    Corrección relativista de la deflexión: 2γ/(γ+1).
+    La deflexión es proporcional a 1/(γ m v²); en el caso clásico
+    m v² = 2eV_acc, y el cociente entre ambos queda 2γ/(γ+1).
+    """
+    gamma = 1 + ELECTRON_CHARGE * np.asarray(V_acc, dtype=float) / (ELECTRON_MASS * SPEED_OF_LIGHT**2)
+    return 2 * gamma / (gamma + 1)
+
+def uniform_field_profile(x):
+    """Campo ideal: uniforme entre las placas y nulo fuera de ellas"""
+    x = np.asarray(x, dtype=float)
+    x_start = GUN_TO_PLATE_DISTANCE
+    x_end = GUN_TO_PLATE_DISTANCE + PLATE_LENGTH
+    return np.where((x > x_start) & (x < x_end), 1.0,
+                    np.where((x == x_start) | (x == x_end), 0.5, 0.0))
+
+def fringe_field_profile(x):
+    """Campo con bordes suaves (tanh) de ancho del orden de la separación de placas"""
+    x = np.asarray(x, dtype=float)
+    x_start = GUN_TO_PLATE_DISTANCE
+    x_end = GUN_TO_PLATE_DISTANCE + PLATE_LENGTH
+    width = FRINGE_FIELD_WIDTH
+    return 0.5 * (np.tanh((x - x_start) / width) - np.tanh((x - x_end) / width))
+
+class RelativisticElectronBeam(ElectronBeam):
+    """Modelo analítico con la corrección relativista de la velocidad del haz"""
+
+    def calculate_trajectory(self, V_acc, V_vert, V_horiz):
+        points, y_final, z_final = super().calculate_trajectory(V_acc, V_vert, V_horiz)
+        if len(points) == 0:
+            return points, y_final, z_final
+        factor = float(relativistic_factor(V_acc))
+        points[:, 1:] *= factor
+        return points, y_final * factor, z_final * factor
+
+    def calculate_trajectories(self, V_acc, V_vert, V_horiz, return_trajectories=False):
+        result = super().calculate_trajectories(V_acc, V_vert, V_horiz, return_trajectories)
+        V_acc = np.broadcast_to(np.asarray(V_acc, dtype=float), result[0].shape)
+        factor = relativistic_factor(V_acc)
+        y_final, z_final = result[0] * factor, result[1] * factor
+        if not return_trajectories:
+            return y_final, z_final
+        trajectories = result[2]
+        trajectories[..., 1:] *= factor[..., None, None]
+        return y_final, z_final, trajectories
+
+    def impact_point(self, V_acc, V_vert, V_horiz):
+        y_final, z_final = super().impact_point(V_acc, V_vert, V_horiz)
+        factor = relativistic_factor(V_acc)
+        return y_final * factor, z_final * factor
+
+    def deflection_sensitivity(self, V_acc):
+        return super().deflection_sensitivity(V_acc) * float(relativistic_factor(V_acc))
+
+class NumericalElectronBeam(ElectronBeam):
+    """
+    Modelo integrado numéricamente a lo largo de X.
+    Ecuación transversal: y'' = c_y * s(x) + k * y, con s(x) el perfil del
+    campo (bordes incluidos), c_y = -f V_vert / (2 d V_acc) y k un término
+    lineal opcional de carga espacial (1/m²). Un haz individual se integra
+    con RK45 (Dormand-Prince) de paso adaptativo; los lotes usan RK4 de
+    paso fijo vectorizado, región por región del campo. Como la ecuación
+    es lineal en c_y, c_z, el punto de impacto se obtiene de la respuesta
+    unitaria integrada una sola vez.
+    """
+
+    # Coeficientes de Dormand-Prince 5(4)
+    _C = np.array([0, 1/5, 3/10, 4/5, 8/9, 1, 1])
+    _A = [
+        [],
+        [1/5],
+        [3/40, 9/40],
+        [44/45, -56/15, 32/9],
+        [19372/6561, -25360/2187, 64448/6561, -212/729],
+        [9017/3168, -355/33, 46732/5247, 49/176, -5103/18656],
+        [35/384, 0, 500/1113, 125/192, -2187/6784, 11/84],
+    ]
+    _B5 = np.array([35/384, 0, 500/1113, 125/192, -2187/6784, 11/84, 0])
+    _B4 = np.array([5179/57600, 0, 7571/16695, 393/640, -92097/339200, 187/2100, 1/40])
+
+    def __init__(self, field_profile=fringe_field_profile, space_charge=0.0,
+                 relativistic=False, rtol=1e-8, atol=1e-12,
+                 batch_substeps=NUMERICAL_BATCH_SUBSTEPS):
+        self.field_profile = field_profile
+        self.space_charge = space_charge
+        self.relativistic = relativistic
+        self.rtol = rtol
+        self.atol = atol
+        self.batch_substeps = batch_substeps
+        self._unit_response = None
+        super().__init__()
+
+    def _coefficients(self, V_acc, V_vert, V_horiz):
+        """Coeficientes c_y, c_z de la ecuación transversal"""
+        V_acc = np.asarray(V_acc, dtype=float)
+        scale = -1.0 / (2 * PLATE_SEPARATION * np.where(V_acc > 0, V_acc, np.nan))
+        if self.relativistic:
+            scale = scale * relativistic_factor(V_acc)
+        return scale * V_vert, scale * V_horiz
+
+    def _derivative(self, x, state, c_y, c_z):
+        """Derivada del estado (y, z, y', z') respecto a x"""
+        return self._field_derivative(self.field_profile(x), state, c_y, c_z)
+
+    def _field_derivative(self, s, state, c_y, c_z):
+        """Derivada del estado con el perfil del campo s ya evaluado"""
+        return np.stack((state[..., 2], state[..., 3],
+                         c_y * s + self.space_charge * state[..., 0],
+                         c_z * s + self.space_charge * state[..., 1]), axis=-1)
+
+    def _rk45_interval(self, x0, x1, state, c_y, c_z, h):
+        """Integra de x0 a x1 con paso adaptativo; retorna (estado, último paso)"""
+        x = x0
+        while x < x1:
+            h = min(h, x1 - x)
+            k = [self._derivative(x, state, c_y, c_z)]
+            for i in range(1, 7):
+                increment = sum(a * k[j] for j, a in enumerate(self._A[i]))
+                k.append(self._derivative(x + self._C[i] * h, state + h * increment, c_y, c_z))
+            k = np.array(k)
+            new_state = state + h * np.tensordot(self._B5, k, axes=1)
+            error = h * np.tensordot(self._B5 - self._B4, k, axes=1)
+
+            tolerance = self.atol + self.rtol * np.maximum(np.abs(state), np.abs(new_state))
+            error_norm = np.sqrt(np.mean((error / tolerance) ** 2))
+            if error_norm <= 1:
+                x += h
+                state = new_state
+            # Control de paso clásico con factor de seguridad
+            h *= min(5.0, max(0.2, 0.9 * error_norm ** -0.2)) if error_norm > 0 else 5.0
+        return state, h
+
+    def _integrate_rk45(self, c_y, c_z):
+        """Integra un haz con RK45 y retorna sus posiciones (y, z) en la malla"""
+        positions = np.zeros((len(self.x_grid), 2))
+        state = np.zeros(4)
+        h = PLATE_LENGTH / 10
+        # Se integra entre puntos consecutivos de la malla para obtener la trayectoria
+        for i in range(1, len(self.x_grid)):
+            x0, x1 = self.x_grid[i - 1], self.x_grid[i]
+            if x1 > x0:
+                state, h = self._rk45_interval(x0, x1, state, c_y, c_z, h)
+            positions[i] = state[:2]
+        return positions
+
+    def calculate_trajectory(self, V_acc, V_vert, V_horiz):
+        if V_acc <= 0:
+            return np.empty((0, 3)), 0, 0
+
+        c_y, c_z = self._coefficients(V_acc, V_vert, V_horiz)
+        points = np.zeros((len(self.x_grid), 3))
+        points[:, 0] = self.x_grid
+        points[:, 1:] = self._integrate_rk45(float(c_y), float(c_z))
+
+        self.trajectory_points = points
+        return points, points[-1, 1], points[-1, 2]
+
+    def calculate_trajectories(self, V_acc, V_vert, V_horiz, return_trajectories=False):
+        V_acc, V_vert, V_horiz = np.broadcast_arrays(
+            np.asarray(V_acc, dtype=float),
+            np.asarray(V_vert, dtype=float),
+            np.asarray(V_horiz, dtype=float))
+        c_y, c_z = self._coefficients(V_acc, V_vert, V_horiz)
+
+        state = np.zeros(V_acc.shape + (4,))
+        if return_trajectories:
+            trajectories = np.zeros(V_acc.shape + (len(self.x_grid), 3))
+            trajectories[..., 0] = self.x_grid
+
+        # RK4 de paso fijo, con batch_substeps pasos entre puntos de la malla
+        for i in range(1, len(self.x_grid)):
+            x0, x1 = self.x_grid[i - 1], self.x_grid[i]
+            h = (x1 - x0) / self.batch_substeps
+            if h > 0:
+                for step in range(self.batch_substeps):
+                    s_start, s_middle, s_end = self._step_profile(x0 + step * h, h)
+                    k1 = self._field_derivative(s_start, state, c_y, c_z)
+                    k2 = self._field_derivative(s_middle, state + h/2 * k1, c_y, c_z)
+                    k3 = self._field_derivative(s_middle, state + h/2 * k2, c_y, c_z)
+                    k4 = self._field_derivative(s_end, state + h * k3, c_y, c_z)
+                    state = state + h/6 * (k1 + 2*k2 + 2*k3 + k4)
+            if return_trajectories:
+                trajectories[..., i, 1:] = state[..., :2]
+
+        if not return_trajectories:
+            return state[..., 0], state[..., 1]
+        return state[..., 0], state[..., 1], trajectories
+
+    def _step_profile(self, x, h):
+        """
+        Perfil del campo en los nodos de un paso RK4 (inicio, mitad, fin).
+        La malla tiene un punto en cada borde de placa, así que ningún paso
+        cruza un borde; los extremos se evalúan apenas dentro del paso para
+        tomar el campo de su región y no el valor del salto (p. ej. 0.5 del
+        perfil uniforme), que RK4 de paso fijo no puede corregir.
+        """
+        inset = h * 1e-9
+        return self.field_profile(np.array([x + inset, x + h/2, x + h - inset]))
+
+    def unit_response(self):
+        """Desplazamiento en pantalla para c_y = 1 (integrado con RK45 una vez)"""
+        if self._unit_response is None:
+            self._unit_response = self._integrate_rk45(1.0, 0.0)[-1, 0]
+        return self._unit_response
+
+    def impact_point(self, V_acc, V_vert, V_horiz):
+        c_y, c_z = self._coefficients(V_acc, V_vert, V_horiz)
+        response = self.unit_response()
+        return c_y * response, c_z * response
+
+    def deflection_sensitivity(self, V_acc):
+        if V_acc <= 0:
+            return 0
+        y_final, _ = self.impact_point(V_acc, -1.0, 0.0)
+        return float(y_final)
+
+# Modelos disponibles por nombre (CLI y configuración)
+PHYSICS_BACKENDS = {
+    "analytic": ElectronBeam,
+    "relativistic": RelativisticElectronBeam,
+    "numerical": NumericalElectronBeam,
+}
+
+def create_electron_beam(name="analytic", **options):
+    """Crea el modelo de haz indicado por nombre"""
+    try:
+        backend = PHYSICS_BACKENDS[name]
+    except KeyError:
+        raise ValueError(f"Modelo físico desconocido: {name!r} "
+                         f"(opciones: {', '.join(PHYSICS_BACKENDS)})")
+    return backend(**options)
@@ -0,0 +1,237 @@
+import argparse
+import fnmatch
+import json
+import os
+import platform
+import subprocess
+import sys
+import timeit
+import numpy as np
+from constants import *
+
+# Las pruebas de dibujo usan superficies de pygame sin abrir ventana
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+# Registro de benchmarks: nombre -> función de preparación.
+# La preparación retorna (función a medir, elementos procesados por llamada)
+BENCHMARKS = {}
+
+def benchmark(name):
+    def register(setup):
+        BENCHMARKS[name] = setup
+        return setup
+    return register
+
+def steady_simulation(persistence, sinusoidal=True):
+    """CRTSimulation con el buffer de persistencia ya lleno"""
+    from crt_simulation import CRTSimulation
+    simulation = CRTSimulation()
+    simulation.sinusoidal_mode = sinusoidal
+    simulation.persistence_frames = persistence
+    for _ in range(persistence + 1):
+        simulation.update()
+    return simulation
+
+@benchmark("trajectory.scalar")
+def bench_trajectory_scalar():
+    from crt_simulation import ElectronBeam
+    beam = ElectronBeam()
+    return lambda: beam.calculate_trajectory(1000, 30, -20), 1
+
+@benchmark("trajectory.batch")
+def bench_trajectory_batch():
+    from crt_simulation import ElectronBeam
+    beam = ElectronBeam()
+    count = 1024
+    rng = np.random.default_rng(0)
+    V_acc = rng.uniform(*ACCELERATION_VOLTAGE_RANGE, count)
+    V_vert = rng.uniform(*DEFLECTION_VOLTAGE_RANGE, count)
+    V_horiz = rng.uniform(*DEFLECTION_VOLTAGE_RANGE, count)
+    return (lambda: beam.calculate_trajectories(V_acc, V_vert, V_horiz, return_trajectories=True),
+            count)
+
+@benchmark("waveform.evaluate")
+def bench_waveform():
+    from waveforms import triangle
+    waveform = triangle()
+    t = np.linspace(0, 1, 1 << 16)
+    return lambda: waveform(t, 1.5, 90), len(t)
+
+def bench_update(persistence):
+    simulation = steady_simulation(persistence)
+    return simulation.update, simulation.samples_per_frame
+
+for _persistence in (1, 100, 500):
+    benchmark(f"simulation.update.p{_persistence}")(
+        lambda persistence=_persistence: bench_update(persistence))
+
+@benchmark("simulation.get_screen_points")
+def bench_screen_points():
+    simulation = steady_simulation(PERSISTENCE_RANGE[1])
+    return simulation.get_screen_points, len(simulation.screen_hits)
+
+@benchmark("render.draw_screen_trace")
+def bench_draw_screen_trace():
+    # Cada llamada avanza un frame para que el fósforo tenga impactos nuevos
+    from main import CRTApp
+    app = CRTApp()
+    app.simulation.sinusoidal_mode = True
+    for _ in range(100):
+        app.simulation.update()
+
+    def step():
+        app.simulation.update()
+        app.draw_screen_trace()
+    return step, 1
+
+@benchmark("render.raster_320x240")
+def bench_raster():
+    # Un cuadro completo: 76800 muestras moduladas, decaimiento y copia a la superficie
+    import pygame
+    from crt_simulation import CRTSimulation
+    from phosphor import PhosphorScreen
+    from raster import RasterScan
+    pygame.display.init()
+    simulation = CRTSimulation()
+    phosphor = PhosphorScreen()
+    frames = np.random.default_rng(0).random((4, RASTER_HEIGHT, RASTER_WIDTH), dtype=np.float32)
+    raster = RasterScan(frames)
+    surface = pygame.Surface((MAIN_SCREEN_WIDTH, MAIN_SCREEN_HEIGHT))
+
+    def frame():
+        simulation.update()
+        phosphor.decay(simulation)
+        raster.step(simulation, phosphor)
+        phosphor.draw(surface, (0, 0))
+    frame()  # Construye el plan de pixeles fuera de la medición
+    return frame, raster.samples_per_frame
+
+@benchmark("render.draw_crt_structure")
+def bench_draw_crt_structure():
+    import pygame
+    from crt_simulation import CRTSimulation
+    pygame.display.init()
+    pygame.font.init()
+    simulation = CRTSimulation()
+    surface = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT))
+    views = [("lateral", pygame.Rect(*LATERAL_VIEW_POS, VIEWPORT_WIDTH, VIEWPORT_HEIGHT)),
+             ("top", pygame.Rect(*TOP_VIEW_POS, VIEWPORT_WIDTH, VIEWPORT_HEIGHT)),
+             ("front", pygame.Rect(*FRONT_VIEW_POS, MAIN_SCREEN_WIDTH, MAIN_SCREEN_HEIGHT))]
+
+    def draw():
+        for view_type, viewport in views:
+            simulation.draw_crt_structure(surface, view_type, viewport)
+    return draw, len(views)
+
+# Arranque en frío: importar el módulo en un intérprete nuevo. Los módulos
+# de física y las herramientas sin ventana no deben importar pygame.
+STARTUP_MODULES = {
+    "crt_simulation": False,
+    "headless": False,
+    "sweep": False,
+    "main": True,
+}
+
+def bench_startup(module, uses_pygame):
+    check = "" if uses_pygame else (
+        "; assert 'pygame' not in sys.modules, 'importar {0} carga pygame'".format(module))
+    command = [sys.executable, "-c", f"import sys, {module}{check}"]
+    directory = os.path.dirname(os.path.abspath(__file__))
+    return lambda: subprocess.run(command, cwd=directory, check=True,
+                                  stdout=subprocess.DEVNULL), 1
+
+for _module, _uses_pygame in STARTUP_MODULES.items():
+    benchmark(f"startup.{_module}")(
+        lambda module=_module, uses_pygame=_uses_pygame: bench_startup(module, uses_pygame))
+
+def measure(function, repeat=BENCHMARK_REPEAT, min_time=BENCHMARK_MIN_TIME):
+    """Tiempo por llamada (s): mínimo y mediana de repeat mediciones"""
+    timer = timeit.Timer(function)
+    number, elapsed = timer.autorange()
+    # autorange llega a ~0.2 s; ajustar el número de llamadas a min_time
+    number = max(1, int(number * min_time / max(elapsed, 1e-9)))
+    times = np.array(timer.repeat(repeat=repeat, number=number)) / number
+    return {"min": float(times.min()), "median": float(np.median(times)), "calls": number}
+
+def run_benchmarks(pattern="*", repeat=BENCHMARK_REPEAT, min_time=BENCHMARK_MIN_TIME):
+    """Ejecuta los benchmarks cuyo nombre coincide con pattern"""
+    results = {}
+    for name, setup in BENCHMARKS.items():
+        if not fnmatch.fnmatch(name, pattern):
+            continue
+        function, items = setup()
+        result = measure(function, repeat, min_time)
+        result["items"] = items
+        result["per_item"] = result["median"] / items
+        results[name] = result
+        print(f"{name:<32} {result['median'] * 1e3:10.4f} ms  "
+              f"({result['per_item'] * 1e6:.3f} µs por elemento)")
+    return results
+
+def environment():
+    """Datos de la máquina guardados junto al baseline"""
+    return {"python": platform.python_version(), "numpy": np.__version__,
+            "machine": platform.machine(), "processor": platform.processor()}
+
+def compare(results, baseline, threshold=BENCHMARK_REGRESSION_THRESHOLD):
+    """
+    Compara las medianas con el baseline.
+    Retorna los nombres cuyo tiempo empeoró más que threshold (fracción).
+    """
+    regressions = []
+    for name, result in results.items():
+        reference = baseline["results"].get(name)
+        if reference is None:
+            print(f"{name:<32} sin baseline")
+            continue
+        change = result["median"] / reference["median"] - 1
+        flag = ""
+        if change > threshold:
+            flag = "  REGRESIÓN"
+            regressions.append(name)
+        print(f"{name:<32} {reference['median'] * 1e3:10.4f} -> "
+              f"{result['median'] * 1e3:10.4f} ms  {change:+7.1%}{flag}")
+    return regressions
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        description="Benchmarks de física, persistencia y dibujo del simulador CRT")
+    parser.add_argument("-k", "--pattern", default="*",
+                        help="Solo benchmarks cuyo nombre coincide (patrón tipo shell)")
+    parser.add_argument("--repeat", type=int, default=BENCHMARK_REPEAT,
+                        help="Mediciones por benchmark")
+    parser.add_argument("--min-time", type=float, default=BENCHMARK_MIN_TIME,
+                        help="Segundos mínimos por medición")
+    parser.add_argument("--save", metavar="ARCHIVO", help="Guardar los resultados como baseline JSON")
+    parser.add_argument("--compare", metavar="ARCHIVO", help="Comparar contra un baseline JSON")
+    parser.add_argument("--threshold", type=float, default=BENCHMARK_REGRESSION_THRESHOLD,
+                        help="Empeoramiento relativo que cuenta como regresión")
+    parser.add_argument("--list", action="store_true", help="Listar los benchmarks y salir")
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.list:
+        print("\n".join(BENCHMARKS))
+        return 0
+
+    results = run_benchmarks(args.pattern, args.repeat, args.min_time)
+
+    if args.save:
+        with open(args.save, "w") as output:
+            json.dump({"environment": environment(), "results": results}, output, indent=2)
+        print(f"Baseline guardado en {args.save}")
+
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            baseline = json.load(baseline_file)
+        print()
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} regresiones (umbral {args.threshold:.0%})")
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,17 +1,32 @@
 import pygame
 from constants import *
+from text_cache import render_text, get_font
+from events import ObservableControl
 
-class Button:
+class Button(ObservableControl):
     def __init__(self, x, y, width, height, text, font_size=20):
         self.rect = pygame.Rect(x, y, width, height)
         self.text = text
-        self.font = pygame.font.Font(None, font_size)
+        self.font_size = font_size
         self.clicked = False
         self.hover = False
         
+    @property
+    def font(self):
+        return get_font(self.font_size)
+    
+    @property
+    def area(self):
+        """Rectángulo que ocupa el botón"""
+        return self.rect
+    
+    def update_hover(self, event):
+        """Actualiza el hover con la posición del evento (si la tiene)"""
+        if hasattr(event, "pos"):
+            self.hover = self.rect.collidepoint(event.pos)
+    
     def handle_event(self, event):
-        mouse_pos = pygame.mouse.get_pos()
-        self.hover = self.rect.collidepoint(mouse_pos)
+        self.update_hover(event)
         
         if event.type == pygame.MOUSEBUTTONDOWN:
             if event.button == 1 and self.hover:
@@ -21,6 +36,7 @@ class Button:
             if event.button == 1:
                 if self.clicked and self.hover:
                     self.clicked = False
+                    self.emit_change(True)
                     return True  # Activar al soltar
                 self.clicked = False
         
@@ -43,7 +59,7 @@ class Button:
         pygame.draw.rect(screen, WHITE, self.rect, 2)
         
         # Dibujar texto centrado
-        text_surface = self.font.render(self.text, True, text_color)
+        text_surface = render_text(self.font, self.text, text_color)
         text_rect = text_surface.get_rect(center=self.rect.center)
         screen.blit(text_surface, text_rect)
 
@@ -63,8 +79,7 @@ class ToggleButton(Button):
         import time
         current_time = time.time()
         
-        mouse_pos = pygame.mouse.get_pos()
-        self.hover = self.rect.collidepoint(mouse_pos)
+        self.update_hover(event)
         
         if event.type == pygame.MOUSEBUTTONDOWN:
             if event.button == 1 and self.hover:
@@ -78,6 +93,7 @@ class ToggleButton(Button):
                     self.clicked = False
                     self.state = not self.state
                     self.update_text()
+                    self.emit_change(self.state)
                     self.last_click_time = current_time
                     return True
                 else:
@@ -88,10 +104,7 @@ class ToggleButton(Button):
         return False
     
     def draw(self, screen):
-        # Cambiar colores basado en estado
-        mouse_pos = pygame.mouse.get_pos()
-        self.hover = self.rect.collidepoint(mouse_pos)
-        
+        # Cambiar colores basado en estado (el hover lo actualizan los eventos)
         if self.state:
             # Estado activado
             if self.clicked:
@@ -119,6 +132,6 @@ class ToggleButton(Button):
         pygame.draw.rect(screen, WHITE, self.rect, 2)
         
         # Dibujar texto centrado
-        text_surface = self.font.render(self.text, True, text_color)
+        text_surface = render_text(self.font, self.text, text_color)
         text_rect = text_surface.get_rect(center=self.rect.center)
         screen.blit(text_surface, text_rect)
\ No newline at end of file
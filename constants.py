@@ -3,6 +3,7 @@ import math
 # Constantes físicas
 ELECTRON_MASS = 9.109e-31  # kg
 ELECTRON_CHARGE = 1.602e-19  # C
+SPEED_OF_LIGHT = 2.998e8  # m/s
 
 # Dimensiones del CRT (en metros para cálculos)
 SCREEN_SIZE = 0.40  # 40 cm
@@ -15,6 +16,13 @@ GUN_TO_PLATE_DISTANCE = 0.10  # 10 cm
 WINDOW_WIDTH = 1400
 WINDOW_HEIGHT = 800
 FPS = 60
+DIRTY_RECT_RENDERING = False  # Actualizar solo las regiones que cambian
+
+# Reloj de simulación de paso fijo
+SIM_STEP = 1/60  # s de simulación por paso de física (independiente de FPS)
+SIM_MAX_CATCHUP_STEPS = 5  # Pasos de física máximos por frame dibujado
+SIM_SPEED_RANGE = (0.125, 8.0)  # Multiplicador de velocidad
+SIMULATION_THREAD = False  # Avanzar la física en un hilo aparte
 
 # Colores
 BLACK = (0, 0, 0)
@@ -42,10 +50,69 @@ PERSISTENCE_RANGE = (1, 500)  # frames
 FREQUENCY_RANGE = (0.1, 10.0)  # Hz
 PHASE_RANGE = (0, 360)  # degrees
 
+# Tamaño de celda del índice espacial de controles
+UI_GRID_CELL = 64  # pixels
+
+# Formas de onda de deflexión (waveforms.py)
+WAVEFORM_AMPLITUDE = 50  # V
+WAVEFORM_TABLE_SIZE = 4096  # Muestras por ciclo en la tabla
+
+# Barrido de televisor (raster.py)
+RASTER_WIDTH = 320  # Muestras por línea
+RASTER_HEIGHT = 240  # Líneas por cuadro
+RASTER_FRAME_RATE = 30  # Cuadros por segundo de la secuencia de imágenes
+RASTER_FILL = 0.9  # Fracción de la pantalla que cubre el barrido
+
+# Muestras del haz por frame en modo sinusoidal
+SAMPLES_PER_FRAME = 16
+
+# Cache de trayectorias (voltajes cuantizados a VOLTAGE_QUANTUM)
+TRAJECTORY_CACHE_SIZE = 256
+VOLTAGE_QUANTUM = 0.1  # V
+
+# Modelo numérico del haz
+FRINGE_FIELD_WIDTH = PLATE_SEPARATION / 2  # Ancho del campo de borde (m)
+NUMERICAL_BATCH_SUBSTEPS = 2  # Pasos RK4 entre puntos de la trayectoria
+
+# Fósforo de la pantalla frontal
+PHOSPHOR_SPOT_RADIUS = 2  # pixels
+PHOSPHOR_CUTOFF = 0.02  # Intensidad relativa al cumplirse la persistencia
+
+# Figuras de Lissajous cerradas (razón de frecuencias racional)
+LISSAJOUS_MAX_DENOMINATOR = 12
+LISSAJOUS_RATIO_TOLERANCE = 1e-3  # Error relativo aceptado en la razón
+LISSAJOUS_POINTS_PER_CYCLE = 256
+LISSAJOUS_MAX_POINTS = 8192
+
+# Perfilador de frames
+PROFILER_WINDOW = 300  # Frames guardados para los percentiles
+PROFILER_OVERLAY_REFRESH = 30  # Frames entre actualizaciones del overlay
+PROFILER_OVERLAY_POS = (350, 592)
+
+# Grabación de sesiones (recording.py)
+RECORDING_CHUNK_FRAMES = 600  # Frames por bloque escrito a disco
+RECORDING_POSITION_QUANTUM = SCREEN_SIZE / 65000  # m (posiciones en int16)
+RECORDING_SEEK_FRAMES = 300  # Salto con las flechas al reproducir
+
+# Exposición larga (long_exposure.py)
+LONG_EXPOSURE_RESOLUTION = 2048  # pixels por lado de la pantalla completa
+LONG_EXPOSURE_FLUSH_HITS = 1 << 16  # Impactos acumulados antes de escribir
+LONG_EXPOSURE_BAND_ROWS = 256  # Filas procesadas a la vez al exportar
+LONG_EXPOSURE_GAMMA = 0.5
+
+# Benchmarks (benchmarks.py)
+BENCHMARK_REPEAT = 5  # Mediciones por benchmark
+BENCHMARK_MIN_TIME = 0.1  # Segundos mínimos por medición
+BENCHMARK_REGRESSION_THRESHOLD = 0.2  # Empeoramiento relativo de la mediana
+
+# Superficies de texto guardadas en la cache
+TEXT_CACHE_SIZE = 512
+
 # Posiciones de viewports
 LATERAL_VIEW_POS = (20, 20)  # Vista lateral arriba izquierda
 TOP_VIEW_POS = (20, 280)  # Vista superior abajo izquierda
 FRONT_VIEW_POS = (350, 50)  # Pantalla a la derecha
+MODE_TEXT_POS = (350, 15)  # Texto de modo sobre la pantalla
 CONTROL_PANEL_POS = (WINDOW_WIDTH - PANEL_WIDTH - 20, 20)
 
 # Escalas para conversión pixel/metro
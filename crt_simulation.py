@@ -1,39 +1,78 @@
+from collections import OrderedDict
 import numpy as np
-import pygame
 import math
 from constants import *
+from persistence_buffer import PersistenceBuffer
+from waveforms import sine
 
 class ElectronBeam:
+    # Número de puntos por tramo: cañón-placas, entre placas, placas-pantalla
+    GUN_POINTS = 20
+    PLATE_POINTS = 30
+    DRIFT_POINTS = 40
+
     def __init__(self):
-        self.trajectory_points = []
+        self.trajectory_points = np.empty((0, 3))
         self.screen_history = []  # Para persistencia
         self.persistence_frames = 100
-        
+        self._build_grid()
+
+    def _build_grid(self):
+        """Precalcula la malla en X de la trayectoria (solo depende de la geometría)"""
+        x_plates_start = GUN_TO_PLATE_DISTANCE
+        x_plates_end = GUN_TO_PLATE_DISTANCE + PLATE_LENGTH
+        x_screen = x_plates_end + PLATE_TO_SCREEN_DISTANCE
+
+        x_gun = np.linspace(0, x_plates_start, self.GUN_POINTS)
+        x_plates = np.linspace(x_plates_start, x_plates_end, self.PLATE_POINTS)
+        x_drift = np.linspace(x_plates_end, x_screen, self.DRIFT_POINTS)
+
+        self.x_grid = np.concatenate((x_gun, x_plates, x_drift))
+
+        # Fracción del tiempo en placas para cada punto entre placas
+        if self.PLATE_POINTS > 1:
+            self.plate_fraction = np.arange(self.PLATE_POINTS) / (self.PLATE_POINTS - 1)
+        else:
+            self.plate_fraction = np.zeros(self.PLATE_POINTS)
+
+        # Distancia recorrida después de las placas
+        self.drift_distance = x_drift - GUN_TO_PLATE_DISTANCE - PLATE_LENGTH
+
+        self.plate_slice = slice(self.GUN_POINTS, self.GUN_POINTS + self.PLATE_POINTS)
+        self.drift_slice = slice(self.GUN_POINTS + self.PLATE_POINTS, len(self.x_grid))
+
+        # Factor geométrico de deflexión: y = -factor * V_placas / V_acc
+        # (de y = a*t_p*(t_p/2 + t_d) con a = -eV/(m*d) y v^2 = 2eV_acc/m)
+        self.deflection_factor = (PLATE_LENGTH * (PLATE_LENGTH / 2 + PLATE_TO_SCREEN_DISTANCE)
+                                  / (2 * PLATE_SEPARATION))
+
+    def deflection_sensitivity(self, V_acc):
+        """Desplazamiento en pantalla por voltio en las placas (m/V)"""
+        return self.deflection_factor / V_acc if V_acc > 0 else 0
+
+    def impact_point(self, V_acc, V_vert, V_horiz):
+        """
+        Punto de impacto (y_final, z_final) en forma cerrada, sin construir
+        la trayectoria. Acepta escalares o arreglos; V_acc <= 0 da NaN.
+        """
+        V_acc = np.asarray(V_acc, dtype=float)
+        scale = -self.deflection_factor / np.where(V_acc > 0, V_acc, np.nan)
+        return scale * V_vert, scale * V_horiz
+
     def calculate_trajectory(self, V_acc, V_vert, V_horiz):
         """
         Calcula la trayectoria del haz de electrones
         V_acc: Voltaje de aceleración (V)
         V_vert: Voltaje de placas verticales (V)
         V_horiz: Voltaje de placas horizontales (V)
+        Retorna un arreglo (N, 3) con los puntos (x, y, z) y el impacto en pantalla
         """
         # Velocidad inicial después de aceleración
         if V_acc <= 0:
-            return [], 0, 0
+            return np.empty((0, 3)), 0, 0
             
         v_initial = math.sqrt(2 * ELECTRON_CHARGE * V_acc / ELECTRON_MASS)
         
-        # Puntos de trayectoria
-        points = []
-        
-        # 1. Desde el cañón hasta las placas (movimiento rectilíneo)
-        x_gun_to_plates = np.linspace(0, GUN_TO_PLATE_DISTANCE, 20)
-        for x in x_gun_to_plates:
-            points.append((x, 0, 0))  # (x, y, z)
-        
-        # 2. Entre las placas (deflexión)
-        x_plates = np.linspace(GUN_TO_PLATE_DISTANCE, 
-                              GUN_TO_PLATE_DISTANCE + PLATE_LENGTH, 30)
-        
         # Campo eléctrico entre placas
         E_vert = V_vert / PLATE_SEPARATION if PLATE_SEPARATION > 0 else 0
         E_horiz = V_horiz / PLATE_SEPARATION if PLATE_SEPARATION > 0 else 0
@@ -45,12 +84,6 @@ class ElectronBeam:
         # Tiempo en las placas
         t_plates = PLATE_LENGTH / v_initial
         
-        for i, x in enumerate(x_plates):
-            t = (i / (len(x_plates) - 1)) * t_plates if len(x_plates) > 1 else 0
-            y = 0.5 * a_vert * t * t
-            z = 0.5 * a_horiz * t * t
-            points.append((x, y, z))
-        
         # Velocidad al salir de las placas
         v_vert_exit = a_vert * t_plates
         v_horiz_exit = a_horiz * t_plates
@@ -59,18 +92,22 @@ class ElectronBeam:
         y_exit = 0.5 * a_vert * t_plates * t_plates
         z_exit = 0.5 * a_horiz * t_plates * t_plates
         
-        # 3. Desde las placas hasta la pantalla (movimiento rectilíneo uniforme)
-        x_to_screen = np.linspace(GUN_TO_PLATE_DISTANCE + PLATE_LENGTH,
-                                 GUN_TO_PLATE_DISTANCE + PLATE_LENGTH + PLATE_TO_SCREEN_DISTANCE, 40)
+        points = np.zeros((len(self.x_grid), 3))
+        points[:, 0] = self.x_grid
+        
+        # 1. Desde el cañón hasta las placas (movimiento rectilíneo): y = z = 0
         
-        for x in x_to_screen:
-            t_travel = (x - GUN_TO_PLATE_DISTANCE - PLATE_LENGTH) / v_initial
-            y = y_exit + v_vert_exit * t_travel
-            z = z_exit + v_horiz_exit * t_travel
-            points.append((x, y, z))
+        # 2. Entre las placas (deflexión)
+        t = self.plate_fraction * t_plates
+        points[self.plate_slice, 1] = 0.5 * a_vert * t * t
+        points[self.plate_slice, 2] = 0.5 * a_horiz * t * t
+        
+        # 3. Desde las placas hasta la pantalla (movimiento rectilíneo uniforme)
+        t_travel = self.drift_distance / v_initial
+        points[self.drift_slice, 1] = y_exit + v_vert_exit * t_travel
+        points[self.drift_slice, 2] = z_exit + v_horiz_exit * t_travel
         
         # Posición final en la pantalla
-        x_screen = GUN_TO_PLATE_DISTANCE + PLATE_LENGTH + PLATE_TO_SCREEN_DISTANCE
         t_final = PLATE_TO_SCREEN_DISTANCE / v_initial
         y_final = y_exit + v_vert_exit * t_final
         z_final = z_exit + v_horiz_exit * t_final
@@ -78,11 +115,130 @@ class ElectronBeam:
         self.trajectory_points = points
         return points, y_final, z_final
 
+    def calculate_trajectories(self, V_acc, V_vert, V_horiz, return_trajectories=False):
+        """
+        Calcula muchos haces a la vez (versión vectorizada de calculate_trajectory)
+        V_acc, V_vert, V_horiz: arreglos (o escalares) de voltajes, con broadcasting
+        Retorna (y_final, z_final) con la forma del broadcast, y si
+        return_trajectories es True también un arreglo (..., N, 3) de trayectorias.
+        Los haces con V_acc <= 0 dan NaN.
+        """
+        V_acc, V_vert, V_horiz = np.broadcast_arrays(
+            np.asarray(V_acc, dtype=float),
+            np.asarray(V_vert, dtype=float),
+            np.asarray(V_horiz, dtype=float))
+
+        valid = V_acc > 0
+        v_initial = np.sqrt(np.where(valid, 2 * ELECTRON_CHARGE * V_acc / ELECTRON_MASS, np.nan))
+
+        # Campo eléctrico y aceleración entre placas
+        E_vert = V_vert / PLATE_SEPARATION if PLATE_SEPARATION > 0 else np.zeros_like(V_vert)
+        E_horiz = V_horiz / PLATE_SEPARATION if PLATE_SEPARATION > 0 else np.zeros_like(V_horiz)
+        a_vert = -ELECTRON_CHARGE * E_vert / ELECTRON_MASS
+        a_horiz = -ELECTRON_CHARGE * E_horiz / ELECTRON_MASS
+
+        t_plates = PLATE_LENGTH / v_initial
+
+        v_vert_exit = a_vert * t_plates
+        v_horiz_exit = a_horiz * t_plates
+        y_exit = 0.5 * a_vert * t_plates * t_plates
+        z_exit = 0.5 * a_horiz * t_plates * t_plates
+
+        t_final = PLATE_TO_SCREEN_DISTANCE / v_initial
+        y_final = y_exit + v_vert_exit * t_final
+        z_final = z_exit + v_horiz_exit * t_final
+
+        if not return_trajectories:
+            return y_final, z_final
+
+        # Trayectorias completas: se agrega un eje para los N puntos
+        shape = V_acc.shape + (len(self.x_grid), 3)
+        trajectories = np.zeros(shape)
+        trajectories[..., 0] = self.x_grid
+        trajectories[~valid] = np.nan
+
+        t = self.plate_fraction * t_plates[..., None]
+        trajectories[..., self.plate_slice, 1] = 0.5 * a_vert[..., None] * t * t
+        trajectories[..., self.plate_slice, 2] = 0.5 * a_horiz[..., None] * t * t
+
+        t_travel = self.drift_distance / v_initial[..., None]
+        trajectories[..., self.drift_slice, 1] = y_exit[..., None] + v_vert_exit[..., None] * t_travel
+        trajectories[..., self.drift_slice, 2] = z_exit[..., None] + v_horiz_exit[..., None] * t_travel
+
+        return y_final, z_final, trajectories
+
+class TrajectoryCache:
+    """
+    Cache LRU de trayectorias y de sus puntos proyectados en las vistas.
+    La clave son los voltajes (V_acc, V_vert, V_horiz) cuantizados a
+    VOLTAGE_QUANTUM, de modo que un haz quieto no se recalcula.
+    """
+
+    def __init__(self, electron_beam, max_size=TRAJECTORY_CACHE_SIZE):
+        self.electron_beam = electron_beam
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def clear(self):
+        self._entries.clear()
+
+    def quantize(self, V_acc, V_vert, V_horiz):
+        """Redondea los voltajes a la resolución de la cache"""
+        return tuple(round(float(v) / VOLTAGE_QUANTUM) for v in (V_acc, V_vert, V_horiz))
+
+    def get(self, V_acc, V_vert, V_horiz):
+        """Retorna un dict con 'trajectory', 'lateral' y 'top' para esos voltajes"""
+        key = self.quantize(V_acc, V_vert, V_horiz)
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+        self.misses += 1
+        voltages = [k * VOLTAGE_QUANTUM for k in key]
+        trajectory, _, _ = self.electron_beam.calculate_trajectory(*voltages)
+        trajectory.flags.writeable = False  # Compartida entre frames
+
+        entry = {
+            'trajectory': trajectory,
+            'lateral': self._project(trajectory, 1, LATERAL_SCALE),
+            'top': self._project(trajectory, 2, TOP_SCALE),
+        }
+        self._entries[key] = entry
+        if len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+        return entry
+
+    def _project(self, trajectory, axis, scale):
+        """Convierte la trayectoria a pixeles de una vista (X contra el eje dado)"""
+        if len(trajectory) == 0:
+            return []
+        screen_x = (trajectory[:, 0] * scale).astype(int)
+        screen_y = (VIEWPORT_HEIGHT // 2 - trajectory[:, axis] * scale).astype(int)
+        return list(zip(screen_x.tolist(), screen_y.tolist()))
+
+def blend_points(previous, current, alpha):
+    """Interpola puntos de una vista entre dos pasos (alpha 0 = previous, 1 = current)"""
+    if alpha >= 1 or len(previous) != len(current):
+        return current
+    if alpha <= 0:
+        return previous
+    previous = np.asarray(previous)
+    blended = previous + alpha * (np.asarray(current) - previous)
+    return list(map(tuple, np.rint(blended).astype(int).tolist()))
+
 class CRTSimulation:
-    def __init__(self):
-        self.electron_beam = ElectronBeam()
+    def __init__(self, electron_beam=None):
+        # Modelo físico del haz (analítico por defecto)
+        self.electron_beam = electron_beam if electron_beam is not None else ElectronBeam()
         self.current_time = 0
-        self.dt = 1/60  # 60 FPS
+        self.dt = SIM_STEP  # Paso fijo de física
         
         # Variables de control
         self.V_acceleration = 1000  # V
@@ -96,92 +252,141 @@ class CRTSimulation:
         self.frequency_horiz = 1.5  # Hz
         self.phase_vert = 0  # degrees
         self.phase_horiz = 90  # degrees
+        # Forma de onda de cada eje (tabla precalculada con su amplitud)
+        self.waveform_vert = sine()
+        self.waveform_horiz = sine()
+        
+        # Muestras del haz por frame en modo sinusoidal
+        self.samples_per_frame = SAMPLES_PER_FRAME
         
         # Historia para persistencia
-        self.screen_hits = []
+        self.screen_hits = PersistenceBuffer(self._persistence_capacity())
+        
+        # Voltajes del haz actual; la trayectoria se calcula solo al pedirla
+        self.beam_voltages = (self.V_acceleration, 0, 0)
+        self.previous_beam_voltages = self.beam_voltages  # Del paso anterior (interpolación)
+        self.trajectory_cache = TrajectoryCache(self.electron_beam)
+    
+    def _persistence_capacity(self):
+        """Impactos necesarios para cubrir la persistencia máxima"""
+        return (PERSISTENCE_RANGE[1] + 1) * self.samples_per_frame
+    
+    def set_electron_beam(self, electron_beam):
+        """Cambia el modelo físico del haz (descarta las trayectorias en cache)"""
+        self.electron_beam = electron_beam
+        self.trajectory_cache = TrajectoryCache(electron_beam)
+    
+    def set_samples_per_frame(self, samples):
+        """Cambia las muestras del haz por frame (reinicia la persistencia)"""
+        self.samples_per_frame = max(1, int(samples))
+        self.screen_hits = PersistenceBuffer(self._persistence_capacity())
+    
+    def sinusoidal_voltages(self, t, frequency_vert=None, frequency_horiz=None):
+        """
+        Voltajes de deflexión periódicos (forma de onda de cada eje) para un
+        tiempo o arreglo de tiempos (las frecuencias se pueden reemplazar,
+        p. ej. para cerrar una figura)
+        """
+        if frequency_vert is None:
+            frequency_vert = self.frequency_vert
+        if frequency_horiz is None:
+            frequency_horiz = self.frequency_horiz
+        V_vert = self.waveform_vert(t, frequency_vert, self.phase_vert)
+        V_horiz = self.waveform_horiz(t, frequency_horiz, self.phase_horiz)
+        return V_vert, V_horiz
         
     def update(self):
         """Actualiza la simulación"""
+        previous_time = self.current_time
         self.current_time += self.dt
+        self.previous_beam_voltages = self.beam_voltages
         
         # Calcular voltajes (manual o sinusoidal)
         if self.sinusoidal_mode:
-            # Modo sinusoidal para Figuras de Lissajous
-            V_vert = 50 * math.sin(2 * math.pi * self.frequency_vert * self.current_time + 
-                                  math.radians(self.phase_vert))
-            V_horiz = 50 * math.sin(2 * math.pi * self.frequency_horiz * self.current_time + 
-                                   math.radians(self.phase_horiz))
+            # Modo sinusoidal para Figuras de Lissajous: varias muestras
+            # repartidas dentro del frame, calculadas en un solo lote
+            n = self.samples_per_frame
+            t = previous_time + self.dt * np.arange(1, n + 1) / n
+            V_vert, V_horiz = self.sinusoidal_voltages(t)
+            y_hits, z_hits = self.electron_beam.impact_point(
+                self.V_acceleration, V_vert, V_horiz)
+            
+            # La trayectoria de las vistas corresponde a la última muestra
+            self.beam_voltages = (self.V_acceleration, V_vert[-1], V_horiz[-1])
+            
+            # Agregar impactos dentro de la pantalla a la historia
+            on_screen = (np.abs(y_hits) <= SCREEN_SIZE/2) & (np.abs(z_hits) <= SCREEN_SIZE/2)
+            self.screen_hits.extend(np.column_stack((y_hits[on_screen], z_hits[on_screen])),
+                                    t[on_screen] * 60)  # Frame number
         else:
             # Modo manual
             V_vert = self.V_vertical
             V_horiz = self.V_horizontal
-        
-        # Calcular trayectoria
-        points, y_final, z_final = self.electron_beam.calculate_trajectory(
-            self.V_acceleration, V_vert, V_horiz)
-        
-        # Agregar punto de impacto a la historia
-        if abs(y_final) <= SCREEN_SIZE/2 and abs(z_final) <= SCREEN_SIZE/2:
-            self.screen_hits.append({
-                'pos': (y_final, z_final),
-                'frame': self.current_time * 60  # Frame number
-            })
+            self.beam_voltages = (self.V_acceleration, V_vert, V_horiz)
+            
+            # Punto de impacto (la trayectoria completa solo se calcula para las vistas)
+            y_final, z_final = self.electron_beam.impact_point(
+                self.V_acceleration, V_vert, V_horiz)
+            
+            # Agregar punto de impacto a la historia
+            if abs(y_final) <= SCREEN_SIZE/2 and abs(z_final) <= SCREEN_SIZE/2:
+                self.screen_hits.append(y_final, z_final,
+                                        self.current_time * 60)  # Frame number
         
         # Limpiar puntos antiguos basado en persistencia
         current_frame = self.current_time * 60
-        self.screen_hits = [hit for hit in self.screen_hits 
-                           if current_frame - hit['frame'] <= self.persistence_frames]
+        self.screen_hits.expire(current_frame, self.persistence_frames)
     
-    def get_lateral_view_points(self):
-        """Obtiene puntos para vista lateral (X-Y)"""
-        if not self.electron_beam.trajectory_points:
-            return []
-        
-        points = []
-        for x, y, z in self.electron_beam.trajectory_points:
-            # Convertir a coordenadas de pantalla
-            screen_x = int(x * LATERAL_SCALE)
-            screen_y = int(VIEWPORT_HEIGHT // 2 - y * LATERAL_SCALE)
-            points.append((screen_x, screen_y))
-        
-        return points
+    def get_trajectory(self):
+        """Trayectoria (N, 3) del haz actual, tomada de la cache si ya se calculó"""
+        trajectory = self.trajectory_cache.get(*self.beam_voltages)['trajectory']
+        self.electron_beam.trajectory_points = trajectory
+        return trajectory
     
-    def get_top_view_points(self):
-        """Obtiene puntos para vista superior (X-Z)"""
-        if not self.electron_beam.trajectory_points:
-            return []
-        
-        points = []
-        for x, y, z in self.electron_beam.trajectory_points:
-            # Convertir a coordenadas de pantalla
-            screen_x = int(x * TOP_SCALE)
-            screen_z = int(VIEWPORT_HEIGHT // 2 - z * TOP_SCALE)
-            points.append((screen_x, screen_z))
-        
-        return points
+    def get_deflection_sensitivity(self):
+        """Sensibilidad de deflexión actual (m/V)"""
+        return self.electron_beam.deflection_sensitivity(self.V_acceleration)
+    
+    def get_lateral_view_points(self, alpha=1.0):
+        """Obtiene puntos para vista lateral (X-Y); alpha < 1 interpola desde el paso anterior"""
+        return self._view_points('lateral', alpha)
+    
+    def get_top_view_points(self, alpha=1.0):
+        """Obtiene puntos para vista superior (X-Z); alpha < 1 interpola desde el paso anterior"""
+        return self._view_points('top', alpha)
+    
+    def _view_points(self, view, alpha):
+        current = self.trajectory_cache.get(*self.beam_voltages)[view]
+        if alpha >= 1 or self.previous_beam_voltages == self.beam_voltages:
+            return current
+        previous = self.trajectory_cache.get(*self.previous_beam_voltages)[view]
+        return blend_points(previous, current, alpha)
     
     def get_screen_points(self):
-        """Obtiene puntos para la pantalla frontal (Y-Z)"""
-        points = []
+        """
+        Obtiene puntos para la pantalla frontal (Y-Z)
+        Retorna arreglos (screen_y, screen_z, intensity) calculados sobre
+        las vistas del buffer de persistencia.
+        """
+        positions = self.screen_hits.positions
         current_frame = self.current_time * 60
         
-        for hit in self.screen_hits:
-            y, z = hit['pos']
-            age = current_frame - hit['frame']
-            
-            # Calcular intensidad basada en edad
-            intensity = max(0, 1.0 - age / self.persistence_frames)
-            
-            # Convertir a coordenadas de pantalla
-            screen_y = int(MAIN_SCREEN_WIDTH // 2 + y * FRONT_SCALE)
-            screen_z = int(MAIN_SCREEN_HEIGHT // 2 - z * FRONT_SCALE)
-            
-            points.append((screen_y, screen_z, intensity))
+        # Calcular intensidad basada en edad
+        age = current_frame - self.screen_hits.frames
+        intensity = np.maximum(0, 1.0 - age / self.persistence_frames)
         
-        return points
+        screen_y, screen_z = self.to_screen_coordinates(positions)
+        return screen_y, screen_z, intensity
+    
+    def to_screen_coordinates(self, positions):
+        """Convierte posiciones (n, 2) en metros a pixeles de la pantalla frontal"""
+        screen_y = (MAIN_SCREEN_WIDTH // 2 + positions[:, 0] * FRONT_SCALE).astype(int)
+        screen_z = (MAIN_SCREEN_HEIGHT // 2 - positions[:, 1] * FRONT_SCALE).astype(int)
+        return screen_y, screen_z
     
     def draw_crt_structure(self, screen, view_type, viewport_rect):
         """Dibuja la estructura del CRT en cada vista"""
+        import pygame  # Solo para dibujar: la física no depende de pygame
         x_offset = viewport_rect.x
         y_offset = viewport_rect.y
         
@@ -0,0 +1,42 @@
+from collections import defaultdict, namedtuple
+
+# Cambio de un parámetro emitido por un control
+ParameterChange = namedtuple("ParameterChange", ["parameter", "value"])
+
+class EventDispatcher:
+    """
+    Entrega cambios de parámetros a los suscriptores de ese parámetro.
+    Un suscriptor con parameter=None recibe todos los cambios.
+    """
+
+    def __init__(self):
+        self._handlers = defaultdict(list)
+
+    def subscribe(self, parameter, handler):
+        """Registra handler(event) para los cambios de parameter"""
+        self._handlers[parameter].append(handler)
+
+    def unsubscribe(self, parameter, handler):
+        self._handlers[parameter].remove(handler)
+
+    def emit(self, parameter, value):
+        event = ParameterChange(parameter, value)
+        for handler in self._handlers.get(parameter, ()):
+            handler(event)
+        for handler in self._handlers.get(None, ()):
+            handler(event)
+
+class ObservableControl:
+    """Mixin para controles que publican su valor en un EventDispatcher"""
+
+    dispatcher = None
+    parameter = None
+
+    def bind(self, dispatcher, parameter):
+        """Asocia el control a un parámetro; cada cambio se emite en dispatcher"""
+        self.dispatcher = dispatcher
+        self.parameter = parameter
+
+    def emit_change(self, value):
+        if self.dispatcher is not None:
+            self.dispatcher.emit(self.parameter, value)
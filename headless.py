@@ -0,0 +1,171 @@
+import argparse
+import sys
+import numpy as np
+from constants import *
+from crt_simulation import CRTSimulation
+from phosphor import PhosphorScreen
+from beam_models import PHYSICS_BACKENDS, create_electron_beam
+from waveforms import WAVEFORMS, create_waveform
+
+class HeadlessRunner:
+    """
+    Ejecuta CRTSimulation sin ventana de pygame.
+    Cada paso avanza la simulación, acumula la imagen de fósforo y
+    (opcionalmente) guarda el flujo de impactos nuevos en pantalla.
+    """
+
+    def __init__(self, simulation=None, record_hits=False, raster=None):
+        self.simulation = simulation if simulation is not None else CRTSimulation()
+        self.phosphor = PhosphorScreen()
+        self.raster = raster  # RasterScan: el haz barre una imagen
+        self.record_hits = record_hits
+        self.frame_count = 0
+
+        # Flujo de impactos: un bloque por frame
+        self._hit_positions = []
+        self._hit_frames = []
+        self._last_frame = -np.inf
+
+    def step(self):
+        """Avanza un frame de simulación"""
+        self.simulation.update()
+        if self.raster is not None:
+            self.phosphor.decay(self.simulation)
+            self.raster.step(self.simulation, self.phosphor)
+        else:
+            self.phosphor.step(self.simulation)
+        self.frame_count += 1
+
+        if self.record_hits:
+            positions, frames = self.simulation.screen_hits.since(self._last_frame)
+            if len(frames):
+                self._hit_positions.append(positions.copy())
+                self._hit_frames.append(frames.copy())
+                self._last_frame = frames[-1]
+
+    def run(self, frames):
+        """Avanza varios frames"""
+        for _ in range(frames):
+            self.step()
+
+    def hit_stream(self):
+        """Retorna (positions (n, 2), frames (n,)) con todos los impactos registrados"""
+        if not self._hit_frames:
+            return np.empty((0, 2)), np.empty(0)
+        return np.concatenate(self._hit_positions), np.concatenate(self._hit_frames)
+
+    def save_hits(self, path):
+        """Guarda el flujo de impactos en un archivo .npz"""
+        positions, frames = self.hit_stream()
+        np.savez_compressed(path, positions=positions, frames=frames)
+
+    def save_image(self, path):
+        """Guarda la imagen de fósforo: .npy con la intensidad o imagen (PNG, BMP...)"""
+        if path.endswith(".npy"):
+            np.save(path, self.phosphor.intensity)
+            return
+        import pygame  # Solo para codificar la imagen, no abre ventana
+        surface = pygame.surfarray.make_surface(self.phosphor.to_rgb())
+        pygame.image.save(surface, path)
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        description="Simulación CRT sin ventana (modo headless)")
+    parser.add_argument("--headless", action="store_true",
+                        help="Ejecutar sin ventana (implícito en este módulo)")
+    parser.add_argument("--frames", type=int, default=600,
+                        help="Frames de simulación a ejecutar")
+    parser.add_argument("--v-acc", type=float, default=1000, help="Voltaje de aceleración (V)")
+    parser.add_argument("--v-vert", type=float, default=0, help="Voltaje placas verticales (V)")
+    parser.add_argument("--v-horiz", type=float, default=0, help="Voltaje placas horizontales (V)")
+    parser.add_argument("--persistence", type=int, default=100, help="Persistencia (frames)")
+    parser.add_argument("--sinusoidal", action="store_true", help="Activar modo sinusoidal")
+    parser.add_argument("--freq-vert", type=float, default=1.0, help="Frecuencia vertical (Hz)")
+    parser.add_argument("--freq-horiz", type=float, default=1.5, help="Frecuencia horizontal (Hz)")
+    parser.add_argument("--phase-vert", type=float, default=0, help="Fase vertical (°)")
+    parser.add_argument("--phase-horiz", type=float, default=90, help="Fase horizontal (°)")
+    parser.add_argument("--wave-vert", choices=list(WAVEFORMS), default="sine",
+                        help="Forma de onda vertical en modo sinusoidal")
+    parser.add_argument("--wave-horiz", choices=list(WAVEFORMS), default="sine",
+                        help="Forma de onda horizontal en modo sinusoidal")
+    parser.add_argument("--amplitude-vert", type=float, default=WAVEFORM_AMPLITUDE,
+                        help="Amplitud vertical (V)")
+    parser.add_argument("--amplitude-horiz", type=float, default=WAVEFORM_AMPLITUDE,
+                        help="Amplitud horizontal (V)")
+    parser.add_argument("--raster", help="Barrido de televisor de una imagen, carpeta o .npy")
+    parser.add_argument("--samples", type=int, default=SAMPLES_PER_FRAME,
+                        help="Muestras del haz por frame en modo sinusoidal")
+    parser.add_argument("--physics", choices=sorted(PHYSICS_BACKENDS), default="analytic",
+                        help="Modelo físico del haz")
+    parser.add_argument("--hits-out", help="Archivo .npz para el flujo de impactos")
+    parser.add_argument("--image-out", help="Imagen final de fósforo (.npy, .png, ...)")
+    parser.add_argument("--record", help="Directorio donde grabar la sesión (ver recording.py)")
+    parser.add_argument("--exposure", help="Exposición larga en un .npy mapeado (continúa si existe)")
+    parser.add_argument("--exposure-image", help="PNG de la exposición larga al terminar")
+    parser.add_argument("--exposure-bits", type=int, choices=(8, 16), default=16,
+                        help="Bits por pixel del PNG de exposición")
+    return parser
+
+def configure_simulation(simulation, args):
+    """Copia los parámetros de línea de comandos a la simulación"""
+    simulation.V_acceleration = args.v_acc
+    simulation.V_vertical = args.v_vert
+    simulation.V_horizontal = args.v_horiz
+    simulation.persistence_frames = args.persistence
+    simulation.sinusoidal_mode = args.sinusoidal
+    simulation.frequency_vert = args.freq_vert
+    simulation.frequency_horiz = args.freq_horiz
+    simulation.phase_vert = args.phase_vert
+    simulation.phase_horiz = args.phase_horiz
+    simulation.waveform_vert = create_waveform(args.wave_vert, args.amplitude_vert)
+    simulation.waveform_horiz = create_waveform(args.wave_horiz, args.amplitude_horiz)
+    simulation.set_samples_per_frame(args.samples)
+    if args.physics != "analytic":
+        simulation.set_electron_beam(create_electron_beam(args.physics))
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    exposure = None
+    if args.exposure:
+        from long_exposure import LongExposure
+        exposure = LongExposure(args.exposure)
+    raster = None
+    if args.raster:
+        from raster import RasterScan, load_frames
+        # La exposición recibe lo que barre el haz, no los impactos de la simulación
+        raster = RasterScan(load_frames(args.raster), exposure=exposure)
+    runner = HeadlessRunner(record_hits=args.hits_out is not None, raster=raster)
+    configure_simulation(runner.simulation, args)
+
+    # Grabadores opcionales del flujo de impactos (record() tras cada paso)
+    recorders = []
+    if args.record:
+        from recording import Recorder
+        recorders.append(Recorder(args.record, runner.simulation.samples_per_frame))
+    if exposure is not None and raster is None:
+        recorders.append(exposure)
+    
+    for _ in range(args.frames):
+        runner.step()
+        for recorder in recorders:
+            recorder.record(runner.simulation)
+    
+    if exposure is not None and args.exposure_image:
+        exposure.export(args.exposure_image, args.exposure_bits)
+    for recorder in recorders:
+        recorder.close()
+    if exposure is not None and raster is not None:
+        exposure.close()
+
+    if args.hits_out:
+        runner.save_hits(args.hits_out)
+    if args.image_out:
+        runner.save_image(args.image_out)
+
+    print(f"{runner.frame_count} frames simulados, "
+          f"{len(runner.simulation.screen_hits)} impactos visibles")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,82 @@
+from fractions import Fraction
+import numpy as np
+from constants import *
+
+def detect_period(frequency_vert, frequency_horiz,
+                  max_denominator=LISSAJOUS_MAX_DENOMINATOR,
+                  tolerance=LISSAJOUS_RATIO_TOLERANCE):
+    """
+    Busca p/q ≈ frequency_vert / frequency_horiz con denominador pequeño.
+    Retorna (p, q) si la razón es racional dentro de la tolerancia
+    (la figura es periódica con período p / frequency_vert), o None.
+    """
+    if frequency_vert <= 0 or frequency_horiz <= 0:
+        return None
+    ratio = frequency_vert / frequency_horiz
+    fraction = Fraction(ratio).limit_denominator(max_denominator)
+    if abs(float(fraction) - ratio) > tolerance * ratio:
+        return None
+    return fraction.numerator, fraction.denominator
+
+class LissajousTrace:
+    """
+    Figura de Lissajous completa calculada en forma cerrada.
+    Cuando la razón de frecuencias es racional se evalúa un período común
+    completo en una sola llamada vectorizada; el resultado (puntos y
+    superficie) queda en cache hasta que cambie un parámetro.
+    """
+
+    def __init__(self, width=MAIN_SCREEN_WIDTH, height=MAIN_SCREEN_HEIGHT):
+        self.width = width
+        self.height = height
+        self._key = None
+        self._points = None
+        self._surface = None
+
+    def _cache_key(self, simulation):
+        return (simulation.frequency_vert, simulation.frequency_horiz,
+                simulation.phase_vert, simulation.phase_horiz,
+                simulation.V_acceleration, id(simulation.electron_beam),
+                simulation.waveform_vert, simulation.waveform_horiz)
+
+    def compute(self, simulation):
+        """Puntos (n, 2) en pixeles de la figura cerrada, o None si no es periódica"""
+        ratio = detect_period(simulation.frequency_vert, simulation.frequency_horiz)
+        if ratio is None:
+            return None
+        p, q = ratio
+
+        # Se ajusta la frecuencia horizontal a la razón exacta para que la curva cierre
+        period = p / simulation.frequency_vert
+        samples = min(LISSAJOUS_MAX_POINTS, LISSAJOUS_POINTS_PER_CYCLE * max(p, q) + 1)
+        t = np.linspace(0, period, samples)
+
+        V_vert, V_horiz = simulation.sinusoidal_voltages(
+            t, frequency_horiz=simulation.frequency_vert * q / p)
+
+        y, z = simulation.electron_beam.impact_point(simulation.V_acceleration, V_vert, V_horiz)
+        xs, ys = simulation.to_screen_coordinates(np.column_stack((y, z)))
+        return np.column_stack((xs, ys))
+
+    def points(self, simulation):
+        """Como compute(), pero en cache mientras los parámetros no cambien"""
+        key = self._cache_key(simulation)
+        if key != self._key:
+            self._key = key
+            self._points = self.compute(simulation)
+            self._surface = None
+        return self._points
+
+    def draw(self, screen, position, simulation):
+        """Dibuja la figura como una polilínea; retorna False si no es periódica"""
+        points = self.points(simulation)
+        if points is None:
+            return False
+
+        import pygame  # Solo se necesita al dibujar
+        if self._surface is None:
+            self._surface = pygame.Surface((self.width, self.height))
+            self._surface.fill(BLACK)
+            pygame.draw.lines(self._surface, GREEN, False, points.tolist(), 2)
+        screen.blit(self._surface, position, special_flags=pygame.BLEND_ADD)
+        return True
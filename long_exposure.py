@@ -0,0 +1,148 @@
+import argparse
+import os
+import struct
+import sys
+import zlib
+import numpy as np
+from constants import *
+
+class LongExposure:
+    """
+    Acumulador de exposición larga de la pantalla completa (SCREEN_SIZE).
+    La intensidad se guarda en un .npy mapeado en memoria de
+    resolution x resolution (filas = z de arriba hacia abajo, columnas = y),
+    así que la captura puede durar horas sin que crezca la memoria.
+    Los impactos se juntan en RAM y se suman en bloques.
+    """
+
+    def __init__(self, path, resolution=LONG_EXPOSURE_RESOLUTION, flush_hits=LONG_EXPOSURE_FLUSH_HITS):
+        self.path = path
+        if os.path.exists(path):
+            # Continuar una captura anterior
+            self.image = np.lib.format.open_memmap(path, mode="r+")
+            resolution = self.image.shape[0]
+        else:
+            self.image = np.lib.format.open_memmap(path, mode="w+", dtype=np.float32,
+                                                   shape=(resolution, resolution))
+        self.resolution = resolution
+        self.flush_hits = flush_hits
+        self.hit_count = 0
+        self._pending_indices = []
+        self._pending_weights = []
+        self._pending_count = 0
+        self._last_frame = -np.inf
+
+    def pixel_indices(self, positions):
+        """Índices planos de pixel para posiciones (n, 2) en metros (-1 fuera de la pantalla)"""
+        scale = self.resolution / SCREEN_SIZE
+        columns = np.floor((positions[:, 0] + SCREEN_SIZE / 2) * scale).astype(np.int64)
+        rows = np.floor((SCREEN_SIZE / 2 - positions[:, 1]) * scale).astype(np.int64)
+        inside = (columns >= 0) & (columns < self.resolution) & (rows >= 0) & (rows < self.resolution)
+        return np.where(inside, rows * self.resolution + columns, -1)
+
+    def add_hits(self, positions, weights=None):
+        """Agrega impactos (n, 2) en metros, con peso 1 o el dado por impacto"""
+        positions = np.asarray(positions, dtype=float).reshape(-1, 2)
+        if len(positions) == 0:
+            return
+        indices = self.pixel_indices(positions)
+        weights = np.broadcast_to(np.float32(1.0) if weights is None else
+                                  np.asarray(weights, dtype=np.float32), indices.shape)
+        inside = indices >= 0
+        self._pending_indices.append(indices[inside])
+        self._pending_weights.append(weights[inside])
+        self._pending_count += int(inside.sum())
+        self.hit_count += len(positions)
+        if self._pending_count >= self.flush_hits:
+            self.flush()
+
+    def record(self, simulation):
+        """Agrega los impactos registrados por la simulación desde el último paso"""
+        positions, frames = simulation.screen_hits.since(self._last_frame)
+        if len(frames):
+            self.add_hits(positions)
+            self._last_frame = frames[-1]
+
+    def flush(self):
+        """Suma los impactos pendientes a la imagen en disco"""
+        if self._pending_count:
+            indices = np.concatenate(self._pending_indices)
+            weights = np.concatenate(self._pending_weights)
+            # Un solo acceso por pixel tocado
+            touched, inverse = np.unique(indices, return_inverse=True)
+            sums = np.bincount(inverse, weights=weights).astype(np.float32)
+            flat = self.image.reshape(-1)
+            flat[touched] += sums
+            self._pending_indices.clear()
+            self._pending_weights.clear()
+            self._pending_count = 0
+        self.image.flush()
+
+    def close(self):
+        self.flush()
+        del self.image
+
+    def export(self, path, bit_depth=16, white=None, gamma=LONG_EXPOSURE_GAMMA):
+        """
+        Guarda la imagen como PNG en escala de grises de 8 o 16 bits.
+        white es la intensidad que se vuelve blanco (por defecto el máximo);
+        la imagen se procesa por franjas para no cargarla completa.
+        """
+        self.flush()
+        export_png(self.image, path, bit_depth, white, gamma)
+
+def _bands(image, rows=LONG_EXPOSURE_BAND_ROWS):
+    for start in range(0, image.shape[0], rows):
+        yield image[start:start + rows]
+
+def export_png(image, path, bit_depth=16, white=None, gamma=LONG_EXPOSURE_GAMMA):
+    """Escribe image (alto, ancho) como PNG en escala de grises, franja por franja"""
+    if bit_depth not in (8, 16):
+        raise ValueError("bit_depth debe ser 8 o 16")
+    if white is None:
+        white = max(float(band.max()) for band in _bands(image)) if image.size else 0.0
+    white = white if white > 0 else 1.0
+    top = (1 << bit_depth) - 1
+    pixel_type = ">u2" if bit_depth == 16 else "u1"
+
+    height, width = image.shape
+    compressor = zlib.compressobj(6)
+    with open(path, "wb") as output:
+        output.write(b"\x89PNG\r\n\x1a\n")
+        _write_chunk(output, b"IHDR", struct.pack(">IIBBBBB", width, height, bit_depth, 0, 0, 0, 0))
+        data = bytearray()
+        for band in _bands(image):
+            levels = np.clip(band / white, 0.0, 1.0) ** gamma * top
+            rows = np.rint(levels).astype(pixel_type)
+            # Filtro 0 (ninguno) al comienzo de cada fila
+            rows = np.concatenate((np.zeros((len(rows), 1), np.uint8),
+                                   rows.view(np.uint8).reshape(len(rows), -1)), axis=1)
+            data += compressor.compress(rows.tobytes())
+            if len(data) >= 1 << 20:
+                _write_chunk(output, b"IDAT", bytes(data))
+                data.clear()
+        data += compressor.flush()
+        _write_chunk(output, b"IDAT", bytes(data))
+        _write_chunk(output, b"IEND", b"")
+
+def _write_chunk(output, kind, payload):
+    output.write(struct.pack(">I", len(payload)))
+    output.write(kind)
+    output.write(payload)
+    output.write(struct.pack(">I", zlib.crc32(kind + payload) & 0xffffffff))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Exporta una exposición larga (.npy) como PNG")
+    parser.add_argument("exposure", help="Archivo .npy de la exposición")
+    parser.add_argument("output", help="Imagen PNG de salida")
+    parser.add_argument("--bits", type=int, choices=(8, 16), default=16, help="Bits por pixel")
+    parser.add_argument("--white", type=float, help="Intensidad que se vuelve blanco (por defecto el máximo)")
+    parser.add_argument("--gamma", type=float, default=LONG_EXPOSURE_GAMMA, help="Corrección gamma")
+    args = parser.parse_args(argv)
+
+    image = np.load(args.exposure, mmap_mode="r")
+    export_png(image, args.output, args.bits, args.white, args.gamma)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
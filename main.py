@@ -1,27 +1,80 @@
-import pygame
 import sys
+
+# python main.py --headless --frames N: simulación sin ventana (sin importar pygame)
+if __name__ == "__main__" and "--headless" in sys.argv[1:]:
+    import headless
+    sys.exit(headless.main(sys.argv[1:]))
+
+import pygame
 from constants import *
+from text_cache import render_text, get_font, release_fonts
 from crt_simulation import CRTSimulation
 from slider import Slider
 from button import Button, ToggleButton
+from phosphor import PhosphorScreen
+from lissajous import LissajousTrace
+from sim_clock import SimulationClock
+from sim_worker import SimulationWorker
+from events import EventDispatcher
+from ui_layer import ControlLayer
+from profiler import FrameProfiler, ProfilerOverlay
 
 class CRTApp:
-    def __init__(self):
+    def __init__(self, dirty_rects=DIRTY_RECT_RENDERING, threaded=SIMULATION_THREAD,
+                 profile=False, profile_out=None, record=None, replay=None, exposure=None,
+                 raster=None):
         pygame.init()
         self.screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
         pygame.display.set_caption("Simulación de Tubo de Rayos Catódicos - Física 3")
         self.clock = pygame.time.Clock()
         self.running = True
         
-        # Inicializar simulación
-        self.simulation = CRTSimulation()
+        # Inicializar simulación (o reproducir una sesión grabada)
+        self.replay = replay is not None
+        if self.replay:
+            from recording import ReplaySimulation
+            self.simulation = ReplaySimulation(replay)
+        else:
+            self.simulation = CRTSimulation()
+        # Reloj de física de paso fijo, separado de los FPS de dibujo: cada
+        # paso avanza la simulación dt segundos, así que debe durar lo mismo
+        self.sim_clock = SimulationClock(step=self.simulation.dt)
+        
+        # Grabadores del flujo de impactos: sesión y exposición larga
+        self.recorders = []
+        if record:
+            from recording import Recorder
+            self.recorders.append(Recorder(record, self.simulation.samples_per_frame))
+        self.exposure = None
+        if exposure:
+            from long_exposure import LongExposure
+            self.exposure = LongExposure(exposure)
+        self.phosphor = PhosphorScreen()
+        self.lissajous = LissajousTrace()
+        self.raster = None
+        if raster is not None:
+            from raster import RasterScan, load_frames
+            # La exposición recibe lo que barre el haz, no los impactos de la simulación
+            self.raster = RasterScan(load_frames(raster), exposure=self.exposure)
+        elif self.exposure is not None:
+            self.recorders.append(self.exposure)
         
-        # Crear controles de interfaz
+        # Estado que se dibuja: la simulación misma, o la última instantánea
+        # publicada por el hilo de simulación en modo threaded
+        self.view = self.simulation
+        after_step = self.record_step if self.recorders else None
+        self.worker = (SimulationWorker(self.simulation, self.sim_clock, after_step)
+                       if threaded else None)
+        
+        # Crear controles de interfaz; cada cambio llega como evento
+        self.events = EventDispatcher()
         self.create_controls()
+        self.bind_controls()
+        self.control_layer = ControlLayer(self.controls, is_active=self.is_control_visible)
         
         # Font para labels
-        self.font = pygame.font.Font(None, 24)
-        self.small_font = pygame.font.Font(None, 18)
+        self.font = get_font(24)
+        self.small_font = get_font(18)
         
         # Definir viewports
         self.lateral_viewport = pygame.Rect(LATERAL_VIEW_POS[0], LATERAL_VIEW_POS[1], 
@@ -30,6 +83,25 @@ class CRTApp:
                                       VIEWPORT_WIDTH, VIEWPORT_HEIGHT)
         self.front_viewport = pygame.Rect(FRONT_VIEW_POS[0], FRONT_VIEW_POS[1], 
                                         MAIN_SCREEN_WIDTH, MAIN_SCREEN_HEIGHT)
+        
+        # Capa estática (estructura, cuadrícula, paneles, textos fijos)
+        self.background = None
+        self.background_key = None
+        
+        # Renderizado por rectángulos sucios: solo se envían a la ventana
+        # las regiones que cambian en cada frame
+        self.dirty_rects = dirty_rects
+        self.full_update_pending = True
+        self.changed_controls = []
+        # Texto de modo de este frame y del anterior (su ancho varía)
+        self.mode_rect = pygame.Rect(MODE_TEXT_POS, (0, 0))
+        self.previous_mode_rect = self.mode_rect
+        
+        # Perfilador de etapas del frame (F3 muestra u oculta el overlay)
+        self.profiler = FrameProfiler(enabled=profile or profile_out is not None)
+        self.profile_out = profile_out
+        self.profiler_overlay = ProfilerOverlay(self.profiler, self.small_font)
+        self.profiler_overlay.visible = self.profiler.enabled
     
     def create_controls(self):
         """Crea todos los controles de la interfaz"""
@@ -103,6 +175,14 @@ class CRTApp:
             PHASE_RANGE[0], PHASE_RANGE[1],
             90, "Fase Horizontal", "°"
         )
+        y += 65
+        
+        # Figura de Lissajous cerrada (analítica) o rastro cuadro a cuadro
+        self.lissajous_button = ToggleButton(
+            x, y, 250, 30,
+            "Figura: Rastro", "Figura: Completa",
+            False
+        )
         
         # Lista de todos los controles
         self.controls = [
@@ -114,7 +194,8 @@ class CRTApp:
             self.freq_vert_slider,
             self.freq_horiz_slider,
             self.phase_vert_slider,
-            self.phase_horiz_slider
+            self.phase_horiz_slider,
+            self.lissajous_button
         ]
     
     def handle_events(self):
@@ -122,34 +203,129 @@ class CRTApp:
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 self.running = False
+            elif event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+                self.full_update_pending = True
+            elif event.type == pygame.KEYDOWN:
+                # Pausa y velocidad de la simulación
+                if event.key == pygame.K_SPACE:
+                    self.sim_clock.toggle_pause()
+                elif event.key in (pygame.K_PLUS, pygame.K_EQUALS, pygame.K_KP_PLUS):
+                    self.sim_clock.set_speed(self.sim_clock.speed * 2)
+                elif event.key in (pygame.K_MINUS, pygame.K_KP_MINUS):
+                    self.sim_clock.set_speed(self.sim_clock.speed / 2)
+                elif event.key in (pygame.K_LEFT, pygame.K_RIGHT) and self.replay:
+                    step = RECORDING_SEEK_FRAMES if event.key == pygame.K_RIGHT else -RECORDING_SEEK_FRAMES
+                    self.seek_replay(self.simulation.frame_index + step)
+                elif event.key == pygame.K_HOME and self.replay:
+                    self.seek_replay(0)
+                elif event.key == pygame.K_F3 and self.profiler.enabled:
+                    self.profiler_overlay.visible = not self.profiler_overlay.visible
+                    self.full_update_pending = True
             
-            # Manejar eventos de controles
-            for control in self.controls:
-                if control.handle_event(event):
-                    self.update_simulation_parameters()
+            # Manejar eventos de controles: solo el control bajo el cursor
+            # (o el que está arrastrando) recibe el evento
+            self.changed_controls.extend(self.control_layer.dispatch(event))
+    
+    def bind_controls(self):
+        """Conecta cada control con el campo de la simulación que modifica"""
+        self.control_bindings = [
+            (self.voltage_acc_slider, "V_acceleration"),
+            (self.voltage_vert_slider, "V_vertical"),
+            (self.voltage_horiz_slider, "V_horizontal"),
+            (self.persistence_slider, "persistence_frames"),
+            (self.sinusoidal_button, "sinusoidal_mode"),
+            (self.freq_vert_slider, "frequency_vert"),
+            (self.freq_horiz_slider, "frequency_horiz"),
+            (self.phase_vert_slider, "phase_vert"),
+            (self.phase_horiz_slider, "phase_horiz"),
+        ]
+        for control, parameter in self.control_bindings:
+            control.bind(self.events, parameter)
+            self.events.subscribe(parameter, self.apply_parameter_change)
+    
+    def apply_parameter_change(self, event):
+        """Copia a la simulación solo el parámetro que cambió"""
+        value = event.value
+        if event.parameter == "persistence_frames":
+            value = int(value)
+        setattr(self.simulation, event.parameter, value)
+    
+    def sync_controls(self):
+        """Muestra en los controles los parámetros de la simulación (al reproducir)"""
+        for control, parameter in self.control_bindings:
+            value = getattr(self.simulation, parameter)
+            if control is self.sinusoidal_button:
+                if control.state != value:
+                    control.state = value
+                    control.update_text()
+                    self.changed_controls.append(control)
+            elif control.value != value:
+                control.set_value(value)
+                self.changed_controls.append(control)
+    
+    def record_step(self, simulation):
+        """Pasa los impactos del último paso a los grabadores"""
+        for recorder in self.recorders:
+            recorder.record(simulation)
+    
+    def seek_replay(self, frame_index):
+        """Salta a un frame de la grabación (en el hilo de simulación si lo hay)"""
+        if self.worker is not None:
+            self.worker.call(self.simulation.seek, frame_index)
+        else:
+            self.simulation.seek(frame_index)
+        self.phosphor.clear()
     
-    def update_simulation_parameters(self):
-        """Actualiza los parámetros de la simulación basado en los controles"""
-        self.simulation.V_acceleration = self.voltage_acc_slider.value
-        self.simulation.V_vertical = self.voltage_vert_slider.value
-        self.simulation.V_horizontal = self.voltage_horiz_slider.value
-        self.simulation.persistence_frames = int(self.persistence_slider.value)
-        self.simulation.sinusoidal_mode = self.sinusoidal_button.state
-        
-        # Parámetros sinusoidales
-        self.simulation.frequency_vert = self.freq_vert_slider.value
-        self.simulation.frequency_horiz = self.freq_horiz_slider.value
-        self.simulation.phase_vert = self.phase_vert_slider.value
-        self.simulation.phase_horiz = self.phase_horiz_slider.value
+    def background_cache_key(self):
+        """Valores de los que depende la capa estática"""
+        return (self.screen.get_size(),
+                tuple(self.lateral_viewport), tuple(self.top_viewport), tuple(self.front_viewport),
+                SCREEN_SIZE, PLATE_SEPARATION, PLATE_LENGTH,
+                PLATE_TO_SCREEN_DISTANCE, GUN_TO_PLATE_DISTANCE,
+                LATERAL_SCALE, TOP_SCALE)
     
-    def draw_viewport(self, viewport, title, color):
+    def invalidate_background(self):
+        """Fuerza a redibujar la capa estática en el próximo frame"""
+        self.background = None
+    
+    def build_background(self):
+        """Dibuja una sola vez todo lo que no cambia entre frames"""
+        background = pygame.Surface(self.screen.get_size())
+        background.fill(BLACK)
+        
+        # Viewports
+        self.draw_viewport(background, self.lateral_viewport, "Vista Lateral (X-Y)", WHITE)
+        self.draw_viewport(background, self.top_viewport, "Vista Superior (X-Z)", WHITE)
+        self.draw_viewport(background, self.front_viewport, "Pantalla Principal (Y-Z)", GREEN)
+        
+        # Estructura del CRT en cada vista
+        self.simulation.draw_crt_structure(background, "lateral", self.lateral_viewport)
+        self.simulation.draw_crt_structure(background, "top", self.top_viewport)
+        self.simulation.draw_crt_structure(background, "front", self.front_viewport)
+        
+        # Partes fijas de los paneles
+        self.draw_info_panel_background(background)
+        self.draw_controls_panel_background(background)
+        self.draw_instructions(background)
+        
+        self.background = background
+        self.background_key = self.background_cache_key()
+        self.full_update_pending = True
+    
+    def draw_background(self):
+        """Copia la capa estática, reconstruyéndola si cambió la geometría"""
+        if self.background is None or self.background_key != self.background_cache_key():
+            self.build_background()
+        self.screen.blit(self.background, (0, 0))
+    
+    def draw_viewport(self, surface, viewport, title, color):
         """Dibuja el marco y título de un viewport"""
-        pygame.draw.rect(self.screen, color, viewport, 2)
-        pygame.draw.rect(self.screen, BLACK, viewport)
+        pygame.draw.rect(surface, color, viewport, 2)
+        pygame.draw.rect(surface, BLACK, viewport)
         
         # Título
-        title_surface = self.font.render(title, True, WHITE)
-        self.screen.blit(title_surface, (viewport.x, viewport.y - 25))
+        title_surface = render_text(self.font, title, WHITE)
+        surface.blit(title_surface, (viewport.x, viewport.y - 25))
     
     def draw_trajectory(self, points, viewport, color):
         """Dibuja la trayectoria del haz de electrones"""
@@ -174,33 +350,34 @@ class CRTApp:
     
     def draw_screen_trace(self):
         """Dibuja el rastro en la pantalla frontal con persistencia"""
-        screen_points = self.simulation.get_screen_points()
+        # Barrido de televisor: el haz recorre la imagen en lugar de los impactos
+        if self.raster is not None:
+            self.phosphor.decay(self.view)
+            self.raster.step(self.view, self.phosphor)
+            self.phosphor.draw(self.screen, self.front_viewport.topleft)
+            return
         
-        for x, y, intensity in screen_points:
-            if (0 <= x < MAIN_SCREEN_WIDTH and 0 <= y < MAIN_SCREEN_HEIGHT):
-                # Calcular color basado en intensidad
-                green_value = int(255 * intensity)
-                color = (0, green_value, 0)
-                
-                # Dibujar punto con tamaño basado en intensidad
-                radius = max(1, int(4 * intensity)) 
-                pygame.draw.circle(self.screen, color,
-                                 (self.front_viewport.x + x, self.front_viewport.y + y), 
-                                 radius)
+        self.phosphor.step(self.view)
+        
+        # Figura completa: una polilínea en cache mientras no cambien los parámetros
+        if (self.simulation.sinusoidal_mode and self.lissajous_button.state and
+                self.lissajous.draw(self.screen, self.front_viewport.topleft, self.view)):
+            return
+        self.phosphor.draw(self.screen, self.front_viewport.topleft)
     
-    def draw_info_panel(self):
-        """Dibuja panel con información física"""
+    def draw_info_panel_background(self, surface):
+        """Dibuja el fondo, título y líneas constantes del panel de información"""
         info_x = 20
         info_y = 540
         
         # Fondo del panel
-        info_rect = pygame.Rect(info_x, info_y, 320, 240)
-        pygame.draw.rect(self.screen, (20, 20, 20), info_rect)
-        pygame.draw.rect(self.screen, WHITE, info_rect, 1)
+        info_rect = pygame.Rect(info_x, info_y, 320, 250)
+        pygame.draw.rect(surface, (20, 20, 20), info_rect)
+        pygame.draw.rect(surface, WHITE, info_rect, 1)
         
         # Título
-        title = self.font.render("Parámetros Físicos", True, WHITE)
-        self.screen.blit(title, (info_x + 10, info_y + 10))
+        title = render_text(self.font, "Parámetros Físicos", WHITE)
+        surface.blit(title, (info_x + 10, info_y + 10))
         
         # Información constante
         info_lines = [
@@ -210,10 +387,7 @@ class CRTApp:
             f"Distancia placas-pantalla: {PLATE_TO_SCREEN_DISTANCE*100:.0f} cm",
             f"Distancia cañón-placas: {GUN_TO_PLATE_DISTANCE*100:.0f} cm",
             "",
-            "Voltajes actuales:",
-            f"• Aceleración: {self.simulation.V_acceleration:.0f} V",
-            f"• Vertical: {self.simulation.V_vertical:.1f} V",
-            f"• Horizontal: {self.simulation.V_horizontal:.1f} V"
+            "Voltajes actuales:"
         ]
         
         y_offset = info_y + 40
@@ -221,117 +395,251 @@ class CRTApp:
             if line == "":
                 y_offset += 10
                 continue
-            text_surface = self.small_font.render(line, True, WHITE)
-            self.screen.blit(text_surface, (info_x + 10, y_offset))
+            text_surface = render_text(self.small_font, line, WHITE)
+            surface.blit(text_surface, (info_x + 10, y_offset))
+            y_offset += 18
+        
+        # Posición de las líneas que cambian cada frame
+        self.info_dynamic_pos = (info_x + 10, y_offset)
+    
+    def draw_info_panel(self):
+        """Dibuja la información física que cambia (voltajes y velocidad)"""
+        x, y_offset = self.info_dynamic_pos
+        
+        info_lines = [
+            f"• Aceleración: {self.simulation.V_acceleration:.0f} V",
+            f"• Vertical: {self.simulation.V_vertical:.1f} V",
+            f"• Horizontal: {self.simulation.V_horizontal:.1f} V"
+        ]
+        
+        for line in info_lines:
+            text_surface = render_text(self.small_font, line, WHITE)
+            self.screen.blit(text_surface, (x, y_offset))
             y_offset += 18
         
         # Información dinámica
         if self.simulation.V_acceleration > 0:
             v_initial = (2 * ELECTRON_CHARGE * self.simulation.V_acceleration / ELECTRON_MASS)**0.5
             velocity_text = f"Velocidad inicial: {v_initial/1e6:.2f} × 10⁶ m/s"
-            text_surface = self.small_font.render(velocity_text, True, GREEN)
-            self.screen.blit(text_surface, (info_x + 10, y_offset + 10))
+            text_surface = render_text(self.small_font, velocity_text, GREEN)
+            self.screen.blit(text_surface, (x, y_offset + 6))
+            
+            sensitivity = self.simulation.get_deflection_sensitivity()
+            sensitivity_text = f"Sensibilidad: {sensitivity*1e3:.3f} mm/V"
+            text_surface = render_text(self.small_font, sensitivity_text, GREEN)
+            self.screen.blit(text_surface, (x, y_offset + 22))
     
-    def draw_controls_panel(self):
-        """Dibuja el panel de controles"""
+    def draw_instructions(self, surface):
+        """Dibuja el texto de instrucciones"""
+        instructions = [
+            "• Ajusta los voltajes para ver la deflexión del haz de electrones",
+            "• Activa el modo sinusoidal para generar figuras de Lissajous",
+            "• La persistencia controla cuánto tiempo permanece visible el rastro",
+            "• Espacio: pausa; +/-: velocidad de la simulación"
+        ]
+        
+        # Título de instrucciones
+        instr_title = render_text(self.font, "Instrucciones:", WHITE)
+        surface.blit(instr_title, (350, 480))
+        
+        y_pos = 505
+        for instruction in instructions:
+            text_surface = render_text(self.small_font, instruction, WHITE)
+            surface.blit(text_surface, (350, y_pos))
+            y_pos += 18
+    
+    def draw_controls_panel_background(self, surface):
+        """Dibuja el fondo y título del panel de controles"""
         panel_rect = pygame.Rect(CONTROL_PANEL_POS[0] - 10, CONTROL_PANEL_POS[1] - 10,
                                 PANEL_WIDTH, WINDOW_HEIGHT - 40)
-        pygame.draw.rect(self.screen, (15, 15, 15), panel_rect)
-        pygame.draw.rect(self.screen, WHITE, panel_rect, 1)
+        pygame.draw.rect(surface, (15, 15, 15), panel_rect)
+        pygame.draw.rect(surface, WHITE, panel_rect, 1)
         
         # Título del panel
-        title = self.font.render("Controles", True, WHITE)
-        self.screen.blit(title, (CONTROL_PANEL_POS[0], CONTROL_PANEL_POS[1] - 30))
-        
-        # Dibujar todos los controles
+        title = render_text(self.font, "Controles", WHITE)
+        surface.blit(title, (CONTROL_PANEL_POS[0], CONTROL_PANEL_POS[1] - 30))
+    
+    def is_control_visible(self, control):
+        """Los controles sinusoidales solo se muestran (y responden) en modo sinusoidal"""
+        if control in [self.freq_vert_slider, self.freq_horiz_slider, 
+                      self.phase_vert_slider, self.phase_horiz_slider,
+                      self.lissajous_button]:
+            return self.simulation.sinusoidal_mode
+        return True
+    
+    def draw_controls_panel(self):
+        """Dibuja el panel de controles"""
+        # Dibujar todos los controles visibles
         for control in self.controls:
-            # Solo mostrar controles sinusoidales si está en modo sinusoidal
-            if control in [self.freq_vert_slider, self.freq_horiz_slider, 
-                          self.phase_vert_slider, self.phase_horiz_slider]:
-                if self.simulation.sinusoidal_mode:
-                    control.draw(self.screen)
-            else:
+            if self.is_control_visible(control):
                 control.draw(self.screen)
     
+    def get_dirty_rects(self):
+        """Regiones de la ventana que pueden cambiar en este frame"""
+        # Margen para líneas y puntos finales dibujados en el borde del viewport
+        rects = [self.lateral_viewport.inflate(8, 8),
+                 self.top_viewport.inflate(8, 8),
+                 self.front_viewport.inflate(8, 8)]
+        
+        # Líneas de voltajes y velocidad del panel de información
+        x, y = self.info_dynamic_pos
+        rects.append(pygame.Rect(x, y, 300, 3 * 18 + 36))
+        
+        # Texto de modo y botones (cambian con el hover)
+        rects.append(self.mode_rect.union(self.previous_mode_rect))
+        rects.append(self.sinusoidal_button.rect.inflate(4, 4))
+        rects.append(self.lissajous_button.rect.inflate(4, 4))
+        
+        # Controles modificados, arrastrados o bajo el cursor
+        touched = set(self.changed_controls)
+        touched.update((self.control_layer.capture, self.control_layer.hovered))
+        touched.discard(None)
+        rects.extend(control.area for control in touched)
+        
+        if self.profiler_overlay.visible:
+            rects.append(self.profiler_overlay.rect)
+        
+        return rects
+    
+    def update_display(self, previous_mode):
+        """Envía el frame a la ventana (completo o solo las regiones sucias)"""
+        # Cambiar de modo muestra u oculta controles: se actualiza todo
+        if self.simulation.sinusoidal_mode != previous_mode:
+            self.full_update_pending = True
+        
+        if not self.dirty_rects or self.full_update_pending:
+            pygame.display.flip()
+            self.full_update_pending = False
+        else:
+            pygame.display.update(self.get_dirty_rects())
+        self.changed_controls.clear()
+    
     def run(self):
         """Loop principal de la aplicación"""
         print("Iniciando simulación CRT...")
+        if self.worker is not None:
+            self.worker.start()
         
+        profiler = self.profiler
         while self.running:
             try:
+                profiler.begin_frame()
+                
                 # Manejar eventos
-                self.handle_events()
+                previous_mode = self.simulation.sinusoidal_mode
+                with profiler.stage("handle_events"):
+                    self.handle_events()
                 
                 # Si el programa debe cerrarse, salir del loop
                 if not self.running:
                     break
                 
-                # Actualizar simulación
-                self.simulation.update()
-                
-                # Limpiar pantalla
-                self.screen.fill(BLACK)
-                
-                # Dibujar viewports
-                self.draw_viewport(self.lateral_viewport, "Vista Lateral (X-Y)", WHITE)
-                self.draw_viewport(self.top_viewport, "Vista Superior (X-Z)", WHITE)  
-                self.draw_viewport(self.front_viewport, "Pantalla Principal (Y-Z)", GREEN)
+                # Actualizar simulación: pasos fijos según el tiempo real transcurrido
+                # (o tomar la última instantánea del hilo de simulación)
+                with profiler.stage("simulation.update"):
+                    if self.worker is not None:
+                        self.view = self.worker.snapshot()
+                    else:
+                        for _ in range(self.sim_clock.advance()):
+                            self.simulation.update()
+                            self.record_step(self.simulation)
+                    if self.replay:
+                        self.sync_controls()
                 
-                # Dibujar estructura del CRT en cada vista
-                self.simulation.draw_crt_structure(self.screen, "lateral", self.lateral_viewport)
-                self.simulation.draw_crt_structure(self.screen, "top", self.top_viewport)
-                self.simulation.draw_crt_structure(self.screen, "front", self.front_viewport)
+                # Capa estática: viewports, estructura del CRT, paneles e instrucciones
+                with profiler.stage("structure"):
+                    self.draw_background()
                 
                 # Dibujar trayectorias
-                lateral_points = self.simulation.get_lateral_view_points()
-                top_points = self.simulation.get_top_view_points()
-                
-                self.draw_trajectory(lateral_points, self.lateral_viewport, YELLOW)
-                self.draw_trajectory(top_points, self.top_viewport, ORANGE)
+                with profiler.stage("trajectory"):
+                    # Interpolar entre los dos últimos pasos según el tiempo real
+                    alpha = self.sim_clock.alpha
+                    lateral_points = self.view.get_lateral_view_points(alpha)
+                    top_points = self.view.get_top_view_points(alpha)
+                    
+                    self.draw_trajectory(lateral_points, self.lateral_viewport, YELLOW)
+                    self.draw_trajectory(top_points, self.top_viewport, ORANGE)
                 
                 # Dibujar rastro en pantalla frontal
-                self.draw_screen_trace()
+                with profiler.stage("screen_trace"):
+                    self.draw_screen_trace()
                 
                 # Dibujar paneles de información
-                self.draw_info_panel()
-                self.draw_controls_panel()
-                
-                # Mostrar el estado actual del modo
-                mode_text = "MODO: " + ("SINUSOIDAL" if self.simulation.sinusoidal_mode else "MANUAL")
-                mode_color = GREEN if self.simulation.sinusoidal_mode else WHITE
-                mode_surface = self.font.render(mode_text, True, mode_color)
-                self.screen.blit(mode_surface, (350, 15))
+                with profiler.stage("panels"):
+                    self.draw_info_panel()
+                    self.draw_controls_panel()
+                    
+                    # Mostrar el estado actual del modo
+                    mode_text = "MODO: " + ("SINUSOIDAL" if self.simulation.sinusoidal_mode else "MANUAL")
+                    if self.sim_clock.paused:
+                        mode_text += " (PAUSA)"
+                    elif self.sim_clock.speed != 1:
+                        mode_text += f" (x{self.sim_clock.speed:g})"
+                    if self.replay:
+                        mode_text += (f"  REPRODUCCIÓN {self.simulation.frame_index + 1}"
+                                      f"/{len(self.simulation.recording)}")
+                    mode_color = GREEN if self.simulation.sinusoidal_mode else WHITE
+                    mode_surface = render_text(self.font, mode_text, mode_color)
+                    self.previous_mode_rect = self.mode_rect
+                    self.mode_rect = self.screen.blit(mode_surface, MODE_TEXT_POS)
                 
-                #instrucciones
-                instructions = [
-                    "• Ajusta los voltajes para ver la deflexión del haz de electrones",
-                    "• Activa el modo sinusoidal para generar figuras de Lissajous",
-                    "• La persistencia controla cuánto tiempo permanece visible el rastro"
-                ]
-                
-                # Título de instrucciones
-                instr_title = self.font.render("Instrucciones:", True, WHITE)
-                self.screen.blit(instr_title, (350, 480))
-                
-                y_pos = 505
-                for instruction in instructions:
-                    text_surface = self.small_font.render(instruction, True, WHITE)
-                    self.screen.blit(text_surface, (350, y_pos))
-                    y_pos += 18
+                # Overlay del perfilador (fuera de las etapas medidas)
+                if self.profiler_overlay.visible:
+                    self.profiler_overlay.refresh(len(self.view.screen_hits))
+                    self.profiler_overlay.draw(self.screen)
                 
                 # Actualizar pantalla
-                pygame.display.flip()
+                with profiler.stage("flip"):
+                    self.update_display(previous_mode)
+                profiler.end_frame()
                 self.clock.tick(FPS)
                 
             except Exception as e:
                 print(f"Error en el loop principal: {e}")
+                profiler.record_error()
                 # Continuar ejecutándose a pesar del error
                 continue
         
         print("Cerrando simulación CRT...")
+        if self.worker is not None:
+            self.worker.stop()
+        outputs = list(self.recorders)
+        if self.raster is not None and self.exposure is not None:
+            outputs.append(self.exposure)
+        for recorder in outputs:
+            recorder.close()
+            print(f"Grabación guardada en {recorder.path}")
+        if self.profile_out is not None:
+            self.profiler.export(self.profile_out)
+            print(f"Perfil de frames guardado en {self.profile_out}")
+        # Las fuentes compartidas mueren con pygame: otra CRTApp crea las suyas
+        release_fonts()
         pygame.quit()
         sys.exit()
 
 if __name__ == "__main__":
-    app = CRTApp()
-    app.run()
\ No newline at end of file
+    def option_value(name):
+        """Valor de una opción --name VALOR, o None"""
+        if name in sys.argv[1:-1]:
+            return sys.argv[sys.argv.index(name) + 1]
+        return None
+    
+    # --profile-out FILE (.csv o .json) exporta el perfil al cerrar;
+    # --record DIR graba la sesión y --replay DIR la reproduce;
+    # --exposure FILE.npy acumula una exposición larga
+    app = CRTApp(dirty_rects="--dirty-rects" in sys.argv[1:] or DIRTY_RECT_RENDERING,
+                 threaded="--threaded" in sys.argv[1:] or SIMULATION_THREAD,
+                 profile="--profile" in sys.argv[1:],
+                 profile_out=option_value("--profile-out"),
+                 record=option_value("--record"),
+                 replay=option_value("--replay"),
+                 exposure=option_value("--exposure"),
+                 raster=option_value("--raster"))
+    
+    # --wave-vert/--wave-horiz NOMBRE: forma de onda del modo sinusoidal
+    from waveforms import create_waveform
+    for axis in ("vert", "horiz"):
+        name = option_value(f"--wave-{axis}")
+        if name is not None:
+            setattr(app.simulation, f"waveform_{axis}", create_waveform(name))
+    app.run()
@@ -0,0 +1,81 @@
+import numpy as np
+
+class PersistenceBuffer:
+    """
+    Buffer circular de capacidad fija para los impactos en pantalla.
+    Guarda posiciones (y, z) y el frame de cada impacto en arreglos
+    preasignados. Cada dato se escribe dos veces (en i y en i + capacidad)
+    para que la ventana de impactos vivos sea siempre un slice contiguo
+    y se pueda exponer como vista sin copiar.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = max(1, int(capacity))
+        self._positions = np.zeros((2 * self.capacity, 2))
+        self._frames = np.zeros(2 * self.capacity)
+        self._write = 0  # Próxima posición de escritura (0..capacity-1)
+        self._count = 0  # Impactos vivos
+
+    def __len__(self):
+        return self._count
+
+    def clear(self):
+        """Elimina todos los impactos"""
+        self._write = 0
+        self._count = 0
+
+    def append(self, y, z, frame):
+        """Agrega un impacto; si el buffer está lleno se descarta el más antiguo"""
+        i = self._write
+        self._positions[i] = self._positions[i + self.capacity] = (y, z)
+        self._frames[i] = self._frames[i + self.capacity] = frame
+        self._write = (i + 1) % self.capacity
+        self._count = min(self._count + 1, self.capacity)
+
+    def extend(self, positions, frames):
+        """Agrega varios impactos a la vez (positions: (n, 2), frames: (n,))"""
+        positions = np.asarray(positions, dtype=float).reshape(-1, 2)
+        frames = np.broadcast_to(np.asarray(frames, dtype=float), (len(positions),))
+        n = len(positions)
+        if n == 0:
+            return
+        if n > self.capacity:
+            positions = positions[-self.capacity:]
+            frames = frames[-self.capacity:]
+            n = self.capacity
+
+        # Índices destino con vuelta al inicio
+        idx = (self._write + np.arange(n)) % self.capacity
+        self._positions[idx] = positions
+        self._positions[idx + self.capacity] = positions
+        self._frames[idx] = frames
+        self._frames[idx + self.capacity] = frames
+        self._write = (self._write + n) % self.capacity
+        self._count = min(self._count + n, self.capacity)
+
+    def expire(self, current_frame, persistence_frames):
+        """Descarta los impactos con edad mayor a persistence_frames"""
+        frames = self.frames
+        # Los frames están ordenados: basta una búsqueda binaria
+        first_alive = np.searchsorted(frames, current_frame - persistence_frames, side='left')
+        self._count -= int(first_alive)
+
+    def since(self, frame):
+        """Vistas (positions, frames) de los impactos posteriores a frame"""
+        frames = self.frames
+        first_new = np.searchsorted(frames, frame, side='right')
+        return self.positions[first_new:], frames[first_new:]
+
+    def _window(self):
+        end = self._write + self.capacity
+        return slice(end - self._count, end)
+
+    @property
+    def positions(self):
+        """Vista (n, 2) de las posiciones vivas, de la más antigua a la más nueva"""
+        return self._positions[self._window()]
+
+    @property
+    def frames(self):
+        """Vista (n,) de los frames de los impactos vivos"""
+        return self._frames[self._window()]
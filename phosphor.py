@@ -0,0 +1,107 @@
+import numpy as np
+from constants import *
+
+class PhosphorScreen:
+    """
+    Renderizador de fósforo para la pantalla frontal.
+    Mantiene una imagen de intensidad en punto flotante que decae en forma
+    multiplicativa cada frame; los impactos nuevos se suman con NumPy y la
+    imagen completa se copia a una superficie con una sola llamada a surfarray.
+    """
+
+    def __init__(self, width=MAIN_SCREEN_WIDTH, height=MAIN_SCREEN_HEIGHT):
+        self.width = width
+        self.height = height
+        # Indexada (x, y) como pygame.surfarray
+        self.intensity = np.zeros((width, height), dtype=np.float32)
+        self.last_frame = -np.inf
+        self.last_time = None  # Tiempo de simulación del último paso
+
+        self._rgb = np.zeros((width, height, 3), dtype=np.uint8)
+        self.surface = None  # Se crea al dibujar por primera vez
+
+        # Huella de cada impacto: disco de radio PHOSPHOR_SPOT_RADIUS
+        r = PHOSPHOR_SPOT_RADIUS
+        dx, dy = np.mgrid[-r:r + 1, -r:r + 1]
+        inside = dx * dx + dy * dy <= r * r
+        self._spot_dx = dx[inside]
+        self._spot_dy = dy[inside]
+        self._spot_weight = (1.0 - np.sqrt(dx[inside]**2 + dy[inside]**2) / (r + 1)).astype(np.float32)
+
+    def clear(self):
+        """Borra la imagen acumulada"""
+        self.intensity.fill(0)
+        self.last_frame = -np.inf
+        self.last_time = None
+
+    def decay_factor(self, persistence_frames):
+        """Factor por frame para que la intensidad caiga a PHOSPHOR_CUTOFF tras la persistencia"""
+        return PHOSPHOR_CUTOFF ** (1.0 / max(1, persistence_frames))
+
+    def deposit(self, xs, ys, weight=1.0):
+        """Suma impactos en las coordenadas de pixel (xs, ys)"""
+        if len(xs) == 0:
+            return
+        # Cada impacto se expande a todos los pixeles de la huella
+        px = (np.asarray(xs)[:, None] + self._spot_dx).ravel()
+        py = (np.asarray(ys)[:, None] + self._spot_dy).ravel()
+        w = np.broadcast_to(np.asarray(weight, dtype=np.float32)[..., None] * self._spot_weight,
+                            (len(xs), len(self._spot_weight))).ravel()
+
+        inside = (px >= 0) & (px < self.width) & (py >= 0) & (py < self.height)
+        flat = px[inside] * self.height + py[inside]
+        np.add.at(self.intensity.reshape(-1), flat, w[inside])
+
+    def splat_plan(self, xs, ys):
+        """
+        Precalcula la huella de impactos que siempre caen en los mismos
+        pixeles (xs, ys): índices planos, muestra de origen y peso de cada
+        pixel tocado. Se usa con deposit_planned().
+        """
+        px = (np.asarray(xs)[:, None] + self._spot_dx).ravel()
+        py = (np.asarray(ys)[:, None] + self._spot_dy).ravel()
+        sample = np.repeat(np.arange(len(xs)), len(self._spot_weight))
+        spot = np.tile(self._spot_weight, len(xs))
+        inside = (px >= 0) & (px < self.width) & (py >= 0) & (py < self.height)
+        return px[inside] * self.height + py[inside], sample[inside], spot[inside]
+
+    def deposit_planned(self, plan, weights):
+        """Suma un peso por muestra en las posiciones de un splat_plan()"""
+        flat, sample, spot = plan
+        image = np.bincount(flat, weights=np.asarray(weights, dtype=np.float32)[sample] * spot,
+                            minlength=self.intensity.size)
+        self.intensity += image.reshape(self.intensity.shape).astype(np.float32)
+
+    def decay(self, simulation):
+        """Decae la imagen según el tiempo simulado desde el último paso"""
+        # El decaimiento sigue al tiempo simulado (0, 1 o varios frames por paso)
+        if self.last_time is None:
+            elapsed_frames = 1
+        else:
+            elapsed_frames = (simulation.current_time - self.last_time) * 60
+        self.last_time = simulation.current_time
+        if elapsed_frames > 0:
+            self.intensity *= self.decay_factor(simulation.persistence_frames) ** elapsed_frames
+
+    def step(self, simulation):
+        """Decae la imagen y agrega los impactos registrados desde el último paso"""
+        self.decay(simulation)
+
+        positions, frames = simulation.screen_hits.since(self.last_frame)
+        if len(frames):
+            xs, ys = simulation.to_screen_coordinates(positions)
+            self.deposit(xs, ys)
+            self.last_frame = frames[-1]
+
+    def to_rgb(self):
+        """Imagen RGB (width, height, 3) en verde fósforo"""
+        np.multiply(np.minimum(self.intensity, 1.0), 255, out=self._rgb[..., 1], casting='unsafe')
+        return self._rgb
+
+    def draw(self, screen, position):
+        """Dibuja la imagen sumándola sobre lo que ya hay en pantalla (cuadrícula)"""
+        import pygame  # Solo se necesita al dibujar (el modo headless no lo usa)
+        if self.surface is None:
+            self.surface = pygame.Surface((self.width, self.height))
+        pygame.surfarray.blit_array(self.surface, self.to_rgb())
+        screen.blit(self.surface, position, special_flags=pygame.BLEND_ADD)
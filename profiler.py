@@ -0,0 +1,154 @@
+import csv
+import json
+import time
+from contextlib import contextmanager, nullcontext
+import numpy as np
+from constants import *
+
+# Etapas del loop principal, en el orden en que se ejecutan
+FRAME_STAGES = ("handle_events", "simulation.update", "structure", "trajectory",
+                "screen_trace", "panels", "flip")
+
+class FrameProfiler:
+    """
+    Registra la duración de cada etapa del frame en una ventana circular
+    de PROFILER_WINDOW frames. Desactivado, stage() no mide nada.
+    """
+
+    def __init__(self, enabled=False, stages=FRAME_STAGES, window=PROFILER_WINDOW):
+        self.enabled = enabled
+        self.stages = tuple(stages)
+        self._index = {name: i for i, name in enumerate(self.stages)}
+        self.window = window
+        self._durations = np.zeros((window, len(self.stages)))
+        self._totals = np.zeros(window)
+        self._starts = np.zeros(window)
+        self._current = np.zeros(len(self.stages))
+        self._frame_start = None
+        self.frames = 0  # Frames registrados desde el inicio
+        self.errors = 0  # Excepciones atrapadas en el loop principal
+
+    def begin_frame(self):
+        if self.enabled:
+            self._current[:] = 0
+            self._frame_start = time.perf_counter()
+
+    def stage(self, name):
+        """Context manager que suma el tiempo del bloque a la etapa name"""
+        if not self.enabled:
+            return nullcontext()
+        return self._measure(self._index[name])
+
+    @contextmanager
+    def _measure(self, index):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._current[index] += time.perf_counter() - start
+
+    def end_frame(self):
+        if not self.enabled or self._frame_start is None:
+            return
+        row = self.frames % self.window
+        self._durations[row] = self._current
+        self._totals[row] = time.perf_counter() - self._frame_start
+        self._starts[row] = self._frame_start
+        self._frame_start = None
+        self.frames += 1
+
+    def record_error(self):
+        self.errors += 1
+        self._frame_start = None
+
+    def durations(self):
+        """(frames, etapas) en segundos, del más antiguo al más nuevo"""
+        count = min(self.frames, self.window)
+        start = self.frames % self.window if self.frames > self.window else 0
+        order = (start + np.arange(count)) % self.window
+        return self._durations[order], self._totals[order]
+
+    def fps(self):
+        """Frames por segundo reales (incluye la espera de clock.tick)"""
+        count = min(self.frames, self.window)
+        if count < 2:
+            return 0.0
+        newest = (self.frames - 1) % self.window
+        oldest = (self.frames - count) % self.window
+        elapsed = self._starts[newest] - self._starts[oldest]
+        return (count - 1) / elapsed if elapsed > 0 else 0.0
+
+    def summary(self):
+        """Percentiles p50/p95/p99 por etapa (ms) y FPS de la ventana"""
+        durations, totals = self.durations()
+        if len(totals) == 0:
+            return {"frames": 0, "fps": 0.0, "stages": {}}
+        percentiles = np.percentile(durations, (50, 95, 99), axis=0) * 1000
+        stages = {name: {"p50": percentiles[0, i], "p95": percentiles[1, i], "p99": percentiles[2, i]}
+                  for i, name in enumerate(self.stages)}
+        total = np.percentile(totals, (50, 95, 99)) * 1000
+        stages["frame"] = {"p50": total[0], "p95": total[1], "p99": total[2]}
+        return {"frames": len(totals), "fps": round(self.fps(), 2), "errors": self.errors,
+                "stages": {name: {k: round(float(v), 4) for k, v in values.items()}
+                           for name, values in stages.items()}}
+
+    def export(self, path):
+        """Exporta la ventana: CSV (un frame por fila, ms) o JSON (resumen y frames)"""
+        durations, totals = self.durations()
+        if path.endswith(".csv"):
+            with open(path, "w", newline="") as output:
+                writer = csv.writer(output)
+                writer.writerow(self.stages + ("frame",))
+                for row, total in zip(durations * 1000, totals * 1000):
+                    writer.writerow([f"{v:.4f}" for v in row] + [f"{total:.4f}"])
+        else:
+            with open(path, "w") as output:
+                json.dump({"summary": self.summary(),
+                           "stages": list(self.stages),
+                           "frames_ms": np.round(np.column_stack((durations, totals)) * 1000, 4).tolist()},
+                          output, indent=2)
+
+class ProfilerOverlay:
+    """Panel en pantalla con FPS, impactos guardados y percentiles por etapa"""
+
+    def __init__(self, profiler, font, position=PROFILER_OVERLAY_POS):
+        self.profiler = profiler
+        self.font = font
+        self.position = position
+        self.visible = True
+        self._header = ""
+        self._rows = []
+        self._last_refresh = -PROFILER_OVERLAY_REFRESH
+
+    @property
+    def rect(self):
+        import pygame
+        # Encabezado, títulos de columnas, una fila por etapa y el frame total
+        row_count = len(self.profiler.stages) + 2
+        return pygame.Rect(self.position[0], self.position[1], 330, 28 + 16 * row_count)
+
+    def refresh(self, hits_stored):
+        """Recalcula el texto (no cada frame, para no medir al propio overlay)"""
+        if self.profiler.frames - self._last_refresh < PROFILER_OVERLAY_REFRESH:
+            return
+        self._last_refresh = self.profiler.frames
+        summary = self.profiler.summary()
+        self._header = (f"FPS: {summary['fps']:.1f}   Impactos: {hits_stored}   "
+                        f"Errores: {self.profiler.errors}")
+        self._rows = [("etapa (ms)", "p50", "p95", "p99")]
+        for name, values in summary["stages"].items():
+            self._rows.append((name, f"{values['p50']:.2f}", f"{values['p95']:.2f}", f"{values['p99']:.2f}"))
+
+    def draw(self, screen):
+        import pygame
+        from text_cache import render_text
+        rect = self.rect
+        pygame.draw.rect(screen, (10, 10, 30), rect)
+        pygame.draw.rect(screen, GRAY, rect, 1)
+        screen.blit(render_text(self.font, self._header, YELLOW), (rect.x + 6, rect.y + 4))
+        y = rect.y + 24
+        # Columnas en posiciones fijas (la fuente no es monoespaciada)
+        for row in self._rows:
+            for column_x, cell in zip((6, 150, 210, 270), row):
+                screen.blit(render_text(self.font, cell, YELLOW), (rect.x + column_x, y))
+            y += 16
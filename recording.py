@@ -0,0 +1,212 @@
+import json
+import os
+import numpy as np
+from constants import *
+from crt_simulation import CRTSimulation
+
+RECORDING_VERSION = 1
+
+# Parámetros de control guardados en cada frame
+RECORDED_PARAMETERS = ("V_acceleration", "V_vertical", "V_horizontal", "persistence_frames",
+                       "sinusoidal_mode", "frequency_vert", "frequency_horiz",
+                       "phase_vert", "phase_horiz")
+
+# Un registro por frame; hit_start/hit_count indexan el archivo de impactos
+FRAME_DTYPE = np.dtype([
+    ("current_time", "<f8"),
+    ("V_acceleration", "<f4"),
+    ("V_vertical", "<f4"),
+    ("V_horizontal", "<f4"),
+    ("persistence_frames", "<i4"),
+    ("sinusoidal_mode", "u1"),
+    ("frequency_vert", "<f4"),
+    ("frequency_horiz", "<f4"),
+    ("phase_vert", "<f4"),
+    ("phase_horiz", "<f4"),
+    ("beam_voltages", "<f4", (3,)),
+    ("hit_start", "<i8"),
+    ("hit_count", "<i4"),
+])
+
+# Impacto: posición cuantizada a RECORDING_POSITION_QUANTUM y edad (en
+# frames, menor a 1) respecto al frame en que se registró
+HIT_DTYPE = np.dtype([("y", "<i2"), ("z", "<i2"), ("age", "<f2")])
+
+FRAMES_FILE = "frames.bin"
+HITS_FILE = "hits.bin"
+HEADER_FILE = "header.json"
+
+class Recorder:
+    """
+    Graba una sesión de CRTSimulation en un directorio:
+    header.json (formato), frames.bin (un registro por frame, sirve de
+    índice) y hits.bin (impactos). Ambos binarios solo crecen al final y se
+    escriben en bloques de RECORDING_CHUNK_FRAMES frames.
+    """
+
+    def __init__(self, path, samples_per_frame=SAMPLES_PER_FRAME,
+                 chunk_frames=RECORDING_CHUNK_FRAMES):
+        self.path = path
+        self.chunk_frames = chunk_frames
+        os.makedirs(path, exist_ok=True)
+        with open(os.path.join(path, HEADER_FILE), "w") as header:
+            json.dump({"version": RECORDING_VERSION,
+                       "frame_dtype": FRAME_DTYPE.descr,
+                       "hit_dtype": HIT_DTYPE.descr,
+                       "position_quantum": RECORDING_POSITION_QUANTUM,
+                       "samples_per_frame": samples_per_frame}, header, indent=2)
+        self._frames_file = open(os.path.join(path, FRAMES_FILE), "wb")
+        self._hits_file = open(os.path.join(path, HITS_FILE), "wb")
+
+        self._pending_frames = []
+        self._pending_hits = []
+        self.frame_count = 0
+        self.hit_count = 0
+        self._last_frame = -np.inf
+
+    def record(self, simulation):
+        """Guarda el estado de control y los impactos nuevos del último paso"""
+        positions, frames = simulation.screen_hits.since(self._last_frame)
+        current_frame = simulation.current_time * 60
+
+        record = np.zeros((), dtype=FRAME_DTYPE)
+        record["current_time"] = simulation.current_time
+        for name in RECORDED_PARAMETERS:
+            record[name] = getattr(simulation, name)
+        record["beam_voltages"] = simulation.beam_voltages
+        record["hit_start"] = self.hit_count
+        record["hit_count"] = len(frames)
+        self._pending_frames.append(record)
+
+        if len(frames):
+            hits = np.empty(len(frames), dtype=HIT_DTYPE)
+            quantized = np.rint(positions / RECORDING_POSITION_QUANTUM)
+            hits["y"] = quantized[:, 0]
+            hits["z"] = quantized[:, 1]
+            hits["age"] = current_frame - frames
+            self._pending_hits.append(hits)
+            self.hit_count += len(frames)
+            self._last_frame = frames[-1]
+
+        self.frame_count += 1
+        if len(self._pending_frames) >= self.chunk_frames:
+            self.flush()
+
+    def flush(self):
+        """Escribe el bloque pendiente al final de los archivos"""
+        if self._pending_frames:
+            self._frames_file.write(np.stack(self._pending_frames).tobytes())
+            self._pending_frames.clear()
+        if self._pending_hits:
+            self._hits_file.write(np.concatenate(self._pending_hits).tobytes())
+            self._pending_hits.clear()
+        self._frames_file.flush()
+        self._hits_file.flush()
+
+    def close(self):
+        self.flush()
+        self._frames_file.close()
+        self._hits_file.close()
+
+class Recording:
+    """
+    Lectura de una sesión grabada. Los archivos se abren con np.memmap,
+    así que abrir una sesión larga es instantáneo; un bloque incompleto
+    al final (grabación interrumpida) se ignora.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, HEADER_FILE)) as header_file:
+            self.header = json.load(header_file)
+        if self.header["version"] != RECORDING_VERSION:
+            raise ValueError(f"Versión de grabación no soportada: {self.header['version']}")
+        self.position_quantum = self.header["position_quantum"]
+        self.samples_per_frame = self.header["samples_per_frame"]
+
+        self.index = self._map(FRAMES_FILE, FRAME_DTYPE)
+        hits = self._map(HITS_FILE, HIT_DTYPE)
+        # Solo los impactos cubiertos por frames completos
+        if len(self.index):
+            last = self.index[-1]
+            hits = hits[:int(last["hit_start"]) + int(last["hit_count"])]
+        self.hits = hits
+        self.frame_numbers = self.index["current_time"] * 60
+
+    def _map(self, name, dtype):
+        filename = os.path.join(self.path, name)
+        count = os.path.getsize(filename) // dtype.itemsize
+        if count == 0:
+            return np.zeros(0, dtype=dtype)
+        return np.memmap(filename, dtype=dtype, mode="r", shape=(count,))
+
+    def __len__(self):
+        return len(self.index)
+
+    def frame_at(self, frame_number):
+        """Índice del primer registro con frame >= frame_number"""
+        return int(np.searchsorted(self.frame_numbers, frame_number, side="left"))
+
+    def hits_between(self, start, stop):
+        """Impactos (positions (n, 2), frames (n,)) de los registros start..stop-1"""
+        if stop <= start:
+            return np.empty((0, 2)), np.empty(0)
+        records = self.index[start:stop]
+        first = int(records["hit_start"][0])
+        last = int(records["hit_start"][-1]) + int(records["hit_count"][-1])
+        hits = self.hits[first:last]
+
+        positions = np.column_stack((hits["y"], hits["z"])) * self.position_quantum
+        record_frames = np.repeat(self.frame_numbers[start:stop], records["hit_count"])
+        return positions, record_frames - hits["age"]
+
+class ReplaySimulation(CRTSimulation):
+    """
+    CRTSimulation que reproduce una grabación: cada update() aplica el
+    siguiente registro y agrega sus impactos sin calcular la física de la
+    pantalla. Las vistas lateral y superior usan los voltajes grabados.
+    """
+
+    def __init__(self, recording, electron_beam=None):
+        super().__init__(electron_beam)
+        self.recording = recording if isinstance(recording, Recording) else Recording(recording)
+        self.set_samples_per_frame(self.recording.samples_per_frame)
+        self.frame_index = -1  # Último registro aplicado
+
+    @property
+    def finished(self):
+        return self.frame_index >= len(self.recording) - 1
+
+    def _apply(self, index):
+        record = self.recording.index[index]
+        self.current_time = float(record["current_time"])
+        for name in RECORDED_PARAMETERS:
+            setattr(self, name, record[name].item())
+        self.persistence_frames = int(self.persistence_frames)
+        self.sinusoidal_mode = bool(self.sinusoidal_mode)
+        self.beam_voltages = tuple(float(v) for v in record["beam_voltages"])
+        self.frame_index = index
+
+    def update(self):
+        """Avanza un registro (al final de la grabación no hace nada)"""
+        if self.finished:
+            return
+        self.previous_beam_voltages = self.beam_voltages
+        self._apply(self.frame_index + 1)
+        positions, frames = self.recording.hits_between(self.frame_index, self.frame_index + 1)
+        self.screen_hits.extend(positions, frames)
+        self.screen_hits.expire(self.current_time * 60, self.persistence_frames)
+
+    def seek(self, index):
+        """Salta al registro index reconstruyendo los impactos aún visibles"""
+        if len(self.recording) == 0:
+            return
+        index = max(0, min(int(index), len(self.recording) - 1))
+        self._apply(index)
+        self.previous_beam_voltages = self.beam_voltages
+        current_frame = self.current_time * 60
+        first = self.recording.frame_at(current_frame - self.persistence_frames)
+        positions, frames = self.recording.hits_between(first, index + 1)
+        self.screen_hits.clear()
+        self.screen_hits.extend(positions, frames)
+        self.screen_hits.expire(current_frame, self.persistence_frames)
@@ -0,0 +1,66 @@
+import time
+from constants import *
+
+class SimulationClock:
+    """
+    Reloj de simulación de paso fijo, independiente de los FPS de dibujo.
+    Acumula el tiempo real transcurrido (multiplicado por la velocidad) y
+    lo convierte en pasos enteros de física. Si el dibujo se atrasa, se
+    ejecutan varios pasos por frame hasta max_steps; el resto se descarta
+    para no entrar en una espiral de recuperación.
+    """
+
+    def __init__(self, step=SIM_STEP, max_steps=SIM_MAX_CATCHUP_STEPS, speed=1.0,
+                 time_source=time.perf_counter):
+        self.step = step
+        self.max_steps = max_steps
+        self.speed = speed
+        self.paused = False
+        self.time_source = time_source
+        self.accumulator = 0.0
+        self.dropped_time = 0.0  # Tiempo descartado por el límite de recuperación
+        self._last = None
+
+    @property
+    def alpha(self):
+        """Fracción del próximo paso ya transcurrida (para interpolar al dibujar)"""
+        pending = 0.0
+        if self._last is not None and not self.paused:
+            # Tiempo desde el último advance() (los pasos pueden correr en otro hilo)
+            pending = (self.time_source() - self._last) * self.speed
+        return min(1.0, (self.accumulator + pending) / self.step)
+
+    def toggle_pause(self):
+        self.paused = not self.paused
+
+    def set_speed(self, speed):
+        """Cambia el multiplicador de velocidad dentro de SIM_SPEED_RANGE"""
+        self.speed = max(SIM_SPEED_RANGE[0], min(SIM_SPEED_RANGE[1], speed))
+
+    def reset(self):
+        """Olvida el tiempo acumulado (p. ej. después de una pausa larga)"""
+        self.accumulator = 0.0
+        self._last = None
+
+    def advance(self):
+        """Retorna cuántos pasos de física corresponden al tiempo real transcurrido"""
+        now = self.time_source()
+        if self._last is None:
+            # Primer frame: un paso para que haya algo que dibujar
+            self._last = now
+            return 0 if self.paused else 1
+        elapsed = now - self._last
+        self._last = now
+
+        if self.paused:
+            return 0
+
+        self.accumulator += elapsed * self.speed
+        steps = int(self.accumulator / self.step + 1e-9)  # Tolerancia de redondeo
+        if steps > self.max_steps:
+            self.dropped_time += (steps - self.max_steps) * self.step
+            steps = self.max_steps
+            self.accumulator = 0.0
+        else:
+            self.accumulator = max(0.0, self.accumulator - steps * self.step)
+        return steps
@@ -0,0 +1,111 @@
+import queue
+import threading
+import time
+import numpy as np
+from constants import *
+from crt_simulation import blend_points
+from sim_clock import SimulationClock
+
+class FrozenHits:
+    """Copia de solo lectura de los impactos vivos (misma interfaz que PersistenceBuffer)"""
+
+    def __init__(self, positions, frames):
+        self.positions = positions
+        self.frames = frames
+        self.positions.flags.writeable = False
+        self.frames.flags.writeable = False
+
+    def __len__(self):
+        return len(self.frames)
+
+    def since(self, frame):
+        first_new = np.searchsorted(self.frames, frame, side='right')
+        return self.positions[first_new:], self.frames[first_new:]
+
+class SimulationSnapshot:
+    """
+    Estado publicado por el hilo de simulación para el hilo de dibujo.
+    Los datos que cambian en cada paso (impactos, tiempo, trayectorias) se
+    copian; el resto (parámetros, modelo del haz, conversiones) se delega a
+    la simulación, cuyos atributos solo se leen desde este lado.
+    """
+
+    def __init__(self, simulation):
+        self._simulation = simulation
+        self.current_time = simulation.current_time
+        self.persistence_frames = simulation.persistence_frames
+        self.sinusoidal_mode = simulation.sinusoidal_mode
+        self.beam_voltages = simulation.beam_voltages
+        self.screen_hits = FrozenHits(simulation.screen_hits.positions.copy(),
+                                      simulation.screen_hits.frames.copy())
+        # Puntos del paso anterior y del actual (para interpolar con alpha)
+        self._lateral_points = (simulation.get_lateral_view_points(0.0),
+                                simulation.get_lateral_view_points())
+        self._top_points = (simulation.get_top_view_points(0.0), simulation.get_top_view_points())
+
+    def __getattr__(self, name):
+        return getattr(self._simulation, name)
+
+    def get_lateral_view_points(self, alpha=1.0):
+        return blend_points(*self._lateral_points, alpha)
+
+    def get_top_view_points(self, alpha=1.0):
+        return blend_points(*self._top_points, alpha)
+
+class SimulationWorker:
+    """
+    Avanza CRTSimulation en un hilo propio con un reloj de paso fijo y
+    publica una SimulationSnapshot nueva después de cada grupo de pasos.
+    La publicación es una sola asignación de referencia, así que el hilo de
+    dibujo toma la última instantánea sin locks. Los cambios estructurales
+    (modelo del haz, muestras por frame) se encolan con call().
+    after_step(simulation), si se da, se llama en este hilo tras cada paso.
+    """
+
+    def __init__(self, simulation, clock=None, after_step=None):
+        self.simulation = simulation
+        self.after_step = after_step
+        self.clock = clock if clock is not None else SimulationClock(step=simulation.dt)
+        self._calls = queue.SimpleQueue()
+        self._running = False
+        self._thread = None
+        self.latest = SimulationSnapshot(simulation)
+        self.steps = 0
+
+    def start(self):
+        self._running = True
+        self._thread = threading.Thread(target=self._loop, name="crt-simulation", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._running = False
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def call(self, function, *args, **kwargs):
+        """Ejecuta function(*args, **kwargs) en el hilo de simulación antes del próximo paso"""
+        self._calls.put((function, args, kwargs))
+
+    def snapshot(self):
+        """Última instantánea publicada"""
+        return self.latest
+
+    def _loop(self):
+        while self._running:
+            while not self._calls.empty():
+                function, args, kwargs = self._calls.get()
+                function(*args, **kwargs)
+
+            steps = self.clock.advance()
+            for _ in range(steps):
+                self.simulation.update()
+                if self.after_step is not None:
+                    self.after_step(self.simulation)
+            if steps:
+                self.steps += steps
+                self.latest = SimulationSnapshot(self.simulation)
+
+            # Dormir hasta que se complete el próximo paso
+            time.sleep(max(0.0, self.clock.step - self.clock.accumulator) / max(self.clock.speed, 1e-3)
+                       if not self.clock.paused else self.clock.step)
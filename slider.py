@@ -1,7 +1,9 @@
 import pygame
 from constants import *
+from text_cache import render_text, get_font
+from events import ObservableControl
 
-class Slider:
+class Slider(ObservableControl):
     def __init__(self, x, y, width, height, min_val, max_val, initial_val, label, unit=""):
         self.rect = pygame.Rect(x, y, width, height)
         self.min_val = min_val
@@ -10,7 +12,7 @@ class Slider:
         self.label = label
         self.unit = unit
         self.dragging = False
-        self.font = pygame.font.Font(None, 20)
+        self.font_size = 20
         
         # Calcular posición inicial del handle
         self.handle_radius = height // 2
@@ -18,6 +20,16 @@ class Slider:
                                     width - 2*self.handle_radius, height//2)
         self.update_handle_pos()
     
+    @property
+    def font(self):
+        return get_font(self.font_size)
+    
+    @property
+    def area(self):
+        """Rectángulo que cubre el slider con su label y su valor"""
+        return pygame.Rect(self.rect.x, self.rect.y - 25,
+                           self.rect.width, self.rect.height + 50)
+    
     def update_handle_pos(self):
         # Calcular posición del handle basada en el valor
         ratio = (self.value - self.min_val) / (self.max_val - self.min_val)
@@ -46,14 +58,21 @@ class Slider:
             
             # Calcular nuevo valor
             ratio = (self.handle_x - self.track_rect.x) / self.track_rect.width
-            self.value = self.min_val + ratio * (self.max_val - self.min_val)
+            value = self.min_val + ratio * (self.max_val - self.min_val)
+            if value != self.value:
+                self.value = value
+                self.emit_change(value)
             return True
         
         return False
     
     def set_value(self, value):
-        self.value = max(self.min_val, min(self.max_val, value))
+        value = max(self.min_val, min(self.max_val, value))
+        changed = value != self.value
+        self.value = value
         self.update_handle_pos()
+        if changed:
+            self.emit_change(value)
     
     def draw(self, screen):
         # Dibujar track
@@ -67,7 +86,7 @@ class Slider:
                           self.handle_radius, 2)
         
         # Dibujar label
-        label_surface = self.font.render(self.label, True, WHITE)
+        label_surface = render_text(self.font, self.label, WHITE)
         screen.blit(label_surface, (self.rect.x, self.rect.y - 25))
         
         # Dibujar valor
@@ -75,5 +94,5 @@ class Slider:
             value_text = f"{self.value:.2f} {self.unit}"
         else:
             value_text = f"{int(self.value)} {self.unit}"
-        value_surface = self.font.render(value_text, True, WHITE)
+        value_surface = render_text(self.font, value_text, WHITE)
         screen.blit(value_surface, (self.rect.x, self.rect.y + self.rect.height + 5))
\ No newline at end of file
@@ -0,0 +1,168 @@
+import argparse
+import itertools
+import json
+import os
+import sys
+import time
+from constants import *
+
+# Parámetros de cada punto de la malla, en orden
+SWEEP_PARAMETERS = ("frequency_vert", "frequency_horiz", "phase_vert", "phase_horiz", "V_acceleration")
+
+def parse_values(text):
+    """
+    Convierte una especificación de valores en lista:
+    '1,2,3' -> [1, 2, 3]; '0.5:2:0.5' -> [0.5, 1.0, 1.5, 2.0] (inicio:fin:paso)
+    """
+    if ":" in text:
+        start, stop, step = (float(v) for v in text.split(":"))
+        count = int(round((stop - start) / step)) + 1
+        return [round(start + i * step, 10) for i in range(count)]
+    return [float(v) for v in text.split(",")]
+
+def build_grid(frequencies_vert, frequencies_horiz, phases_vert, phases_horiz, voltages):
+    """Lista de configuraciones (dict) para el producto cartesiano de los valores"""
+    return [dict(zip(SWEEP_PARAMETERS, values))
+            for values in itertools.product(frequencies_vert, frequencies_horiz,
+                                            phases_vert, phases_horiz, voltages)]
+
+def job_name(params, settings):
+    """
+    Nombre de archivo estable para una configuración; incluye los ajustes
+    comunes (frames, persistencia, muestras) porque también cambian la imagen
+    """
+    return ("fv{frequency_vert:g}_fh{frequency_horiz:g}_pv{phase_vert:g}"
+            "_ph{phase_horiz:g}_va{V_acceleration:g}"
+            "_n{frames}_p{persistence}_s{samples}").format(**params, **settings)
+
+def run_job(params, settings, output_dir, save_png):
+    """
+    Ejecuta una simulación headless y guarda la imagen de fósforo.
+    Se ejecuta en un proceso del pool; retorna la entrada del manifiesto.
+    """
+    import numpy as np  # Importados en el proceso trabajador
+    from headless import HeadlessRunner
+
+    start = time.perf_counter()
+    runner = HeadlessRunner()
+    simulation = runner.simulation
+    for name, value in params.items():
+        setattr(simulation, name, value)
+    simulation.sinusoidal_mode = True
+    simulation.persistence_frames = settings["persistence"]
+    simulation.set_samples_per_frame(settings["samples"])
+    runner.run(settings["frames"])
+
+    name = job_name(params, settings)
+    image_path = os.path.join(output_dir, name + ".npy")
+    # Escritura atómica: un archivo a medias no cuenta como terminado al reanudar
+    temporary_path = image_path + ".tmp.npy"
+    np.save(temporary_path, runner.phosphor.intensity)
+    os.replace(temporary_path, image_path)
+    if save_png:
+        runner.save_image(os.path.join(output_dir, name + ".png"))
+
+    return {
+        "name": name,
+        "params": params,
+        "settings": settings,
+        "image": os.path.basename(image_path),
+        "seconds": round(time.perf_counter() - start, 4),
+    }
+
+class SweepRunner:
+    """
+    Reparte una malla de configuraciones de Lissajous entre procesos.
+    Cada resultado se agrega a manifest.jsonl apenas termina, así que una
+    ejecución interrumpida se reanuda saltando los trabajos ya registrados.
+    """
+
+    def __init__(self, output_dir, frames=600, persistence=PERSISTENCE_RANGE[1],
+                 samples=SAMPLES_PER_FRAME, workers=None, save_png=False):
+        self.output_dir = output_dir
+        self.frames = frames
+        self.persistence = persistence
+        self.samples = samples
+        self.workers = workers or os.cpu_count()
+        self.save_png = save_png
+        self.manifest_path = os.path.join(output_dir, "manifest.jsonl")
+    
+    @property
+    def settings(self):
+        """Ajustes comunes a todos los trabajos de la malla"""
+        return {"frames": self.frames, "persistence": self.persistence, "samples": self.samples}
+
+    def completed_jobs(self):
+        """
+        Nombres de trabajos registrados en el manifiesto con su imagen en
+        disco y los mismos parámetros y ajustes que esta ejecución
+        """
+        completed = set()
+        if not os.path.exists(self.manifest_path):
+            return completed
+        with open(self.manifest_path) as manifest:
+            for line in manifest:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # Línea cortada por una interrupción
+                if (entry.get("settings") == self.settings and
+                        entry["name"] == job_name(entry["params"], self.settings) and
+                        os.path.exists(os.path.join(self.output_dir, entry["image"]))):
+                    completed.add(entry["name"])
+        return completed
+
+    def run(self, grid):
+        """Ejecuta los trabajos pendientes de la malla; retorna cuántos se ejecutaron"""
+        os.makedirs(self.output_dir, exist_ok=True)
+        done = self.completed_jobs()
+        pending = [params for params in grid if job_name(params, self.settings) not in done]
+        print(f"{len(grid)} configuraciones, {len(grid) - len(pending)} ya completadas, "
+              f"{len(pending)} pendientes con {self.workers} procesos")
+
+        # Importado aquí: listar o reanudar una malla no necesita el pool
+        from concurrent.futures import ProcessPoolExecutor, as_completed
+        with open(self.manifest_path, "a") as manifest, \
+                ProcessPoolExecutor(max_workers=self.workers) as pool:
+            futures = [pool.submit(run_job, params, self.settings, self.output_dir, self.save_png)
+                       for params in pending]
+            for count, future in enumerate(as_completed(futures), 1):
+                entry = future.result()
+                manifest.write(json.dumps(entry) + "\n")
+                manifest.flush()
+                print(f"[{count}/{len(pending)}] {entry['name']} ({entry['seconds']:.2f} s)")
+        return len(pending)
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        description="Catálogo de figuras de Lissajous en paralelo (sin ventana)")
+    parser.add_argument("output_dir", help="Carpeta de imágenes y manifiesto")
+    parser.add_argument("--freq-vert", type=parse_values, default=[1.0],
+                        help="Frecuencias verticales (Hz): 'a,b,c' o 'inicio:fin:paso'")
+    parser.add_argument("--freq-horiz", type=parse_values, default=[1.0, 1.5, 2.0, 3.0],
+                        help="Frecuencias horizontales (Hz)")
+    parser.add_argument("--phase-vert", type=parse_values, default=[0.0], help="Fases verticales (°)")
+    parser.add_argument("--phase-horiz", type=parse_values, default=[0.0, 90.0],
+                        help="Fases horizontales (°)")
+    parser.add_argument("--v-acc", type=parse_values, default=[1000.0],
+                        help="Voltajes de aceleración (V)")
+    parser.add_argument("--frames", type=int, default=600, help="Frames por simulación")
+    parser.add_argument("--persistence", type=int, default=PERSISTENCE_RANGE[1],
+                        help="Persistencia (frames)")
+    parser.add_argument("--samples", type=int, default=SAMPLES_PER_FRAME,
+                        help="Muestras del haz por frame")
+    parser.add_argument("--workers", type=int, default=None, help="Procesos (por defecto, uno por núcleo)")
+    parser.add_argument("--png", action="store_true", help="Guardar también PNG")
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    grid = build_grid(args.freq_vert, args.freq_horiz, args.phase_vert,
+                      args.phase_horiz, args.v_acc)
+    runner = SweepRunner(args.output_dir, frames=args.frames, persistence=args.persistence,
+                         samples=args.samples, workers=args.workers, save_png=args.png)
+    runner.run(grid)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
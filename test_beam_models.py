@@ -0,0 +1,17 @@
+import numpy as np
+import pytest
+from beam_models import NumericalElectronBeam, fringe_field_profile, uniform_field_profile
+
+VOLTAGES = [(150, 100, -100), (1000, 30, -20), (2000, -50, 80)]
+
+@pytest.mark.parametrize("profile", [uniform_field_profile, fringe_field_profile])
+def test_batch_matches_rk45(profile):
+    # El lote RK4 no debe promediar el salto del campo en los bordes de placa
+    beam = NumericalElectronBeam(field_profile=profile)
+    V_acc, V_vert, V_horiz = (np.array(v, dtype=float) for v in zip(*VOLTAGES))
+    y, z, trajectories = beam.calculate_trajectories(V_acc, V_vert, V_horiz, return_trajectories=True)
+    for i, voltages in enumerate(VOLTAGES):
+        points, y_single, z_single = beam.calculate_trajectory(*voltages)
+        assert y[i] == pytest.approx(y_single, rel=1e-5)
+        assert z[i] == pytest.approx(z_single, rel=1e-5)
+        assert np.abs(trajectories[i, :, 1:] - points[:, 1:]).max() < 1e-5
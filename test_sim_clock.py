@@ -0,0 +1,37 @@
+from crt_simulation import CRTSimulation
+from sim_clock import SimulationClock
+
+def fake_clock(step=0.1):
+    now = [0.0]
+    clock = SimulationClock(step=step, time_source=lambda: now[0])
+    clock.advance()
+    return clock, now
+
+def test_alpha_follows_real_time():
+    clock, now = fake_clock()
+    now[0] = 0.25
+    assert clock.advance() == 2
+    assert abs(clock.alpha - 0.5) < 1e-9
+    # Sin llamar advance() (pasos en otro hilo) sigue avanzando, con tope 1
+    now[0] = 0.28
+    assert abs(clock.alpha - 0.8) < 1e-9
+    now[0] = 1.0
+    assert clock.alpha == 1.0
+
+def test_alpha_frozen_while_paused():
+    clock, now = fake_clock()
+    now[0] = 0.05
+    clock.advance()
+    clock.toggle_pause()
+    now[0] = 0.5
+    assert abs(clock.alpha - 0.5) < 1e-9
+
+def test_view_points_interpolate_between_steps():
+    simulation = CRTSimulation()
+    simulation.V_vertical = 100
+    simulation.update()
+    previous = simulation.get_lateral_view_points(0.0)
+    current = simulation.get_lateral_view_points()
+    middle = simulation.get_lateral_view_points(0.5)
+    assert previous != current
+    assert abs(middle[-1][1] - (previous[-1][1] + current[-1][1]) / 2) <= 1
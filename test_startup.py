@@ -0,0 +1,13 @@
+import os
+import subprocess
+import sys
+import pytest
+
+# Módulos de física y herramientas sin ventana: importarlos no debe cargar pygame
+@pytest.mark.parametrize("module", ["crt_simulation", "headless", "sweep"])
+def test_import_without_pygame(module):
+    code = f"import sys, {module}; assert 'pygame' not in sys.modules, 'importar {module} carga pygame'"
+    directory = os.path.dirname(os.path.abspath(__file__))
+    result = subprocess.run([sys.executable, "-c", code], cwd=directory,
+                            capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
@@ -0,0 +1,29 @@
+import numpy as np
+from crt_simulation import CRTSimulation
+from waveforms import WAVEFORMS, sine
+
+def test_negative_phase_wraps():
+    # Fases negativas diminutas: np.mod da exactamente 1.0
+    waveform = sine()
+    cycles = np.array([-1e-17, -1e-12, -0.5, -1.0, -180 / 360.0])
+    expected = np.sin(2 * np.pi * cycles)
+    assert np.allclose(waveform.at_phase(cycles), expected, atol=1e-5)
+    assert abs(waveform.at_phase(-1e-17)) < 1e-5
+
+def test_wrap_boundaries():
+    # Fases que caen justo en el límite de un ciclo (enteros) o de la tabla
+    for factory in WAVEFORMS.values():
+        waveform = factory(1.0)
+        boundaries = np.array([0.0, 1.0, -1.0, 2.0, -3.0, 1 - 1e-16, np.nextafter(1.0, 0)])
+        values = waveform.at_phase(boundaries)
+        assert np.all(np.isfinite(values))
+        assert np.all(np.abs(values) <= 1.0 + 1e-9)
+
+def test_simulation_negative_phase():
+    # Antes fallaba con IndexError cerca de t = 0.5 s
+    simulation = CRTSimulation()
+    simulation.sinusoidal_mode = True
+    simulation.phase_vert = -180
+    for _ in range(60):
+        simulation.update()
+    assert len(simulation.screen_hits) > 0
@@ -0,0 +1,65 @@
+from collections import OrderedDict
+from constants import *
+
+class TextCache:
+    """
+    Cache LRU de superficies de texto renderizadas.
+    La clave es (font, text, color): un texto que no cambia se renderiza
+    una sola vez y los siguientes frames reutilizan la superficie.
+    """
+
+    def __init__(self, max_size=TEXT_CACHE_SIZE):
+        self.max_size = max_size
+        self._surfaces = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._surfaces)
+
+    def clear(self):
+        self._surfaces.clear()
+
+    def render(self, font, text, color, antialias=True):
+        """Equivalente a font.render(text, antialias, color) con cache"""
+        key = (font, text, color, antialias)
+        surface = self._surfaces.get(key)
+        if surface is not None:
+            self._surfaces.move_to_end(key)
+            self.hits += 1
+            return surface
+
+        self.misses += 1
+        surface = font.render(text, antialias, color)
+        self._surfaces[key] = surface
+        if len(self._surfaces) > self.max_size:
+            # Descartar la entrada usada hace más tiempo
+            self._surfaces.popitem(last=False)
+        return surface
+
+# Fuentes compartidas por tamaño (se crean al pedirlas por primera vez)
+_fonts = {}
+
+def get_font(size):
+    """Fuente por defecto de pygame del tamaño dado, una sola por tamaño"""
+    import pygame  # Solo se necesita al dibujar texto
+    if not pygame.font.get_init():
+        # Las fuentes de una inicialización anterior ya no son válidas
+        release_fonts()
+        pygame.font.init()
+    font = _fonts.get(size)
+    if font is None:
+        font = _fonts[size] = pygame.font.Font(None, size)
+    return font
+
+def release_fonts():
+    """Descarta las fuentes y el texto renderizado (llamar antes de pygame.quit())"""
+    _fonts.clear()
+    text_cache.clear()
+
+# Cache compartida por sliders, botones y paneles
+text_cache = TextCache()
+
+def render_text(font, text, color, antialias=True):
+    """Renderiza texto usando la cache compartida"""
+    return text_cache.render(font, text, color, antialias)
@@ -0,0 +1,66 @@
+from collections import defaultdict
+import pygame
+from constants import *
+
+MOUSE_EVENTS = (pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP, pygame.MOUSEMOTION)
+
+class ControlLayer:
+    """
+    Capa de interfaz que enruta los eventos del mouse a un solo control.
+    Los rectángulos de los controles se guardan en una grilla uniforme
+    (índice espacial), así que cada evento consulta solo la celda bajo el
+    cursor. El control que está capturando el mouse (slider arrastrado o
+    botón presionado) recibe los eventos aunque el cursor salga de él.
+    """
+
+    def __init__(self, controls, is_active=None, cell_size=UI_GRID_CELL):
+        self.controls = list(controls)
+        self.is_active = is_active if is_active is not None else (lambda control: True)
+        self.cell_size = cell_size
+        self.hovered = None
+        self.capture = None
+        self.rebuild()
+
+    def rebuild(self):
+        """Reconstruye el índice (llamar si los controles cambian de lugar)"""
+        self._cells = defaultdict(list)
+        for control in self.controls:
+            rect = control.area
+            for cell_x in range(rect.left // self.cell_size, (rect.right - 1) // self.cell_size + 1):
+                for cell_y in range(rect.top // self.cell_size, (rect.bottom - 1) // self.cell_size + 1):
+                    self._cells[(cell_x, cell_y)].append(control)
+
+    def control_at(self, pos):
+        """Control activo bajo la posición dada, o None"""
+        cell = (pos[0] // self.cell_size, pos[1] // self.cell_size)
+        for control in self._cells.get(cell, ()):
+            if control.area.collidepoint(pos) and self.is_active(control):
+                return control
+        return None
+
+    def _is_capturing(self, control):
+        return getattr(control, "dragging", False) or getattr(control, "clicked", False)
+
+    def dispatch(self, event):
+        """
+        Entrega el evento al control que corresponde.
+        Retorna la lista de controles cuyo handle_event retornó True.
+        """
+        if event.type not in MOUSE_EVENTS:
+            return []
+
+        if self.capture is not None and self._is_capturing(self.capture):
+            target = self.capture
+        else:
+            target = self.control_at(event.pos)
+        receivers = [target] if target is not None else []
+
+        # El control que deja de estar bajo el cursor recibe el evento para
+        # actualizar su hover
+        if self.hovered is not None and self.hovered is not target:
+            receivers.append(self.hovered)
+        self.hovered = target
+
+        changed = [control for control in receivers if control.handle_event(event)]
+        self.capture = target if target is not None and self._is_capturing(target) else None
+        return changed
@@ -0,0 +1,104 @@
+import numpy as np
+from constants import *
+
+class Waveform:
+    """
+    Forma de onda periódica de deflexión precalculada en una tabla indexada
+    por fase (un ciclo en WAVEFORM_TABLE_SIZE muestras, valores en [-1, 1]).
+    Evaluarla para un arreglo de tiempos es una interpolación lineal en la
+    tabla, sin cálculo por muestra en Python. Es inmutable: with_amplitude()
+    retorna una copia, así que puede usarse como clave de cache.
+    """
+
+    def __init__(self, name, table, amplitude=WAVEFORM_AMPLITUDE):
+        self.name = name
+        # Se repite la primera muestra al final para interpolar sin vuelta
+        table = np.asarray(table, dtype=float)
+        self._table = np.append(table, table[0])
+        self._table.flags.writeable = False
+        self.size = len(table)
+        self.amplitude = amplitude
+
+    def with_amplitude(self, amplitude):
+        waveform = Waveform.__new__(Waveform)
+        waveform.__dict__.update(self.__dict__)
+        waveform.amplitude = amplitude
+        return waveform
+
+    def at_phase(self, cycles):
+        """Valor normalizado para una fase en ciclos (escalar o arreglo)"""
+        position = np.mod(cycles, 1.0) * self.size
+        index = position.astype(int) if isinstance(position, np.ndarray) else int(position)
+        fraction = position - index
+        # Una fase negativa muy pequeña da mod == 1.0 (index == size): es la fase 0
+        index = index % self.size
+        return self._table[index] + fraction * (self._table[index + 1] - self._table[index])
+
+    def __call__(self, t, frequency, phase_degrees=0.0):
+        """Voltaje (amplitud * forma) para tiempos t (s), frecuencia (Hz) y fase (°)"""
+        return self.amplitude * self.at_phase(np.asarray(t) * frequency + phase_degrees / 360.0)
+
+    def __repr__(self):
+        return f"Waveform({self.name!r}, amplitude={self.amplitude:g})"
+
+def _phases(size):
+    """Fases de la tabla en ciclos: 0, 1/size, ..., (size-1)/size"""
+    return np.arange(size) / size
+
+def sine(amplitude=WAVEFORM_AMPLITUDE, size=WAVEFORM_TABLE_SIZE):
+    return Waveform("sine", np.sin(2 * np.pi * _phases(size)), amplitude)
+
+def square(amplitude=WAVEFORM_AMPLITUDE, size=WAVEFORM_TABLE_SIZE, duty=0.5):
+    return Waveform("square", np.where(_phases(size) < duty, 1.0, -1.0), amplitude)
+
+def triangle(amplitude=WAVEFORM_AMPLITUDE, size=WAVEFORM_TABLE_SIZE):
+    # Empieza en 0 y sube, como el seno
+    phase = _phases(size)
+    return Waveform("triangle", 1 - 4 * np.abs(np.mod(phase + 0.25, 1.0) - 0.5), amplitude)
+
+def sawtooth(amplitude=WAVEFORM_AMPLITUDE, size=WAVEFORM_TABLE_SIZE):
+    # Rampa de -1 a 1 con retorno instantáneo (barrido de un televisor)
+    return Waveform("sawtooth", 2 * _phases(size) - 1, amplitude)
+
+def harmonics(coefficients, amplitude=WAVEFORM_AMPLITUDE, size=WAVEFORM_TABLE_SIZE):
+    """
+    Suma de armónicos: coefficients es una lista de (n, peso) o
+    (n, peso, fase en °). La tabla se normaliza a un pico de 1.
+    """
+    phase = _phases(size)
+    table = np.zeros(size)
+    for coefficient in coefficients:
+        n, weight = coefficient[:2]
+        offset = np.radians(coefficient[2]) if len(coefficient) > 2 else 0.0
+        table += weight * np.sin(2 * np.pi * n * phase + offset)
+    return Waveform("harmonics", _normalized(table), amplitude)
+
+def from_samples(samples, amplitude=WAVEFORM_AMPLITUDE, size=WAVEFORM_TABLE_SIZE):
+    """Un ciclo dado por muestras equiespaciadas, remuestreado a la tabla y normalizado"""
+    samples = np.asarray(samples, dtype=float).ravel()
+    if len(samples) < 2:
+        raise ValueError("Se necesitan al menos 2 muestras por ciclo")
+    positions = np.arange(len(samples) + 1) / len(samples)
+    table = np.interp(_phases(size), positions, np.append(samples, samples[0]))
+    return Waveform("samples", _normalized(table), amplitude)
+
+def _normalized(table):
+    peak = np.abs(table).max()
+    return table / peak if peak > 0 else table
+
+# Formas de onda con nombre (para la línea de comandos)
+WAVEFORMS = {
+    "sine": sine,
+    "square": square,
+    "triangle": triangle,
+    "sawtooth": sawtooth,
+}
+
+def create_waveform(name, amplitude=WAVEFORM_AMPLITUDE):
+    """Crea una forma de onda por nombre; ValueError si no existe"""
+    try:
+        factory = WAVEFORMS[name]
+    except KeyError:
+        raise ValueError(f"Forma de onda desconocida: {name!r} "
+                         f"(opciones: {', '.join(WAVEFORMS)})")
+    return factory(amplitude)